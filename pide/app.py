@@ -1,6 +1,10 @@
 """Main application window for Pide."""
 
 import sys
+import time
+
+_IMPORT_STARTED = time.perf_counter()  # For --startup-profile; set before importing Qt
+
 from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication,
@@ -14,32 +18,143 @@ from PySide6.QtWidgets import (
     QTreeView,
     QPushButton,
     QLabel,
-    QFrame,
+    QMenu,
     QFileDialog,
     QMessageBox,
     QFileSystemModel,
-    QGraphicsView,
-    QGraphicsScene,
 )
-from PySide6.QtCore import Qt, QProcess, QRegularExpression, QPointF, QTimer
+from PySide6.QtCore import (
+    Qt, QProcess, QProcessEnvironment, QTimer,
+    QByteArray, QSocketNotifier, QObject, QThread, Signal, Slot, QElapsedTimer, QEvent,
+)
 from PySide6.QtGui import (
     QFont, QAction, QKeySequence, QKeyEvent, QMouseEvent, QTextCursor,
-    QSyntaxHighlighter, QTextCharFormat, QColor, QPen, QBrush, QPainter,
-    QPolygonF, QTransform, QShortcut,
+    QSyntaxHighlighter, QTextCharFormat, QColor, QShortcut, QTextDocument,
 )
+import base64
+import binascii
+import codecs
+import hashlib
 import json
-import math
+import os
 import re
+import select
+import signal
+import socket
+import struct
+from collections import deque
+
+from pide import turtle_protocol
 
 # Code directory (repo root / code) — demo/, turtle/, learn/ are in git
 PIDE_HOME = Path(__file__).parent.parent / "code"
+# Edit journals for crash recovery (hidden from the file tree)
+JOURNAL_DIR = PIDE_HOME / ".cache" / "journal"
+
+
+# Python keywords
+_KEYWORDS = frozenset([
+    "and", "as", "assert", "break", "class", "continue", "def", "del",
+    "elif", "else", "except", "False", "finally", "for", "from", "global",
+    "if", "import", "in", "is", "lambda", "None", "nonlocal", "not", "or",
+    "pass", "raise", "return", "True", "try", "while", "with", "yield"
+])
+
+# Python builtins
+_BUILTINS = frozenset([
+    "abs", "all", "any", "ascii", "bin", "bool", "bytearray", "bytes",
+    "callable", "chr", "classmethod", "compile", "complex", "delattr",
+    "dict", "dir", "divmod", "enumerate", "eval", "exec", "filter",
+    "float", "format", "frozenset", "getattr", "globals", "hasattr",
+    "hash", "help", "hex", "id", "input", "int", "isinstance", "issubclass",
+    "iter", "len", "list", "locals", "map", "max", "memoryview", "min",
+    "next", "object", "oct", "open", "ord", "pow", "print", "property",
+    "range", "repr", "reversed", "round", "set", "setattr", "slice",
+    "sorted", "staticmethod", "str", "sum", "super", "tuple", "type",
+    "vars", "zip", "__import__"
+])
+
+# Keywords whose following name is highlighted as a definition
+_DEFINITION_KEYWORDS = {"class": "class", "def": "function"}
+
+# All token kinds in one alternation, tried in order at each position. Strings
+# and comments come first so that nothing inside them is highlighted. A triple
+# quoted string left open at the end of the line (open_string) continues on the
+# next block; any other unterminated string runs to the end of the line.
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>\#.*)
+  | (?P<open_string>
+        [rRbBuUfF]{0,2}
+        (?: "{3} (?:[^"\\]|\\.|"(?!""))*
+          | '{3} (?:[^'\\]|\\.|'(?!''))*
+        ) \\?$
+    )
+  | (?P<string>
+        [rRbBuUfF]{0,2}
+        (?: "{3} (?:[^"\\]|\\.|"(?!""))* "{3}
+          | '{3} (?:[^'\\]|\\.|'(?!''))* '{3}
+          | "    (?:[^"\\]|\\.)*          (?:"|\\?$)
+          | '    (?:[^'\\]|\\.)*          (?:'|\\?$)
+        )
+    )
+  | (?P<name>[^\W\d]\w*)
+  | (?P<number>
+        0[xX][0-9a-fA-F_]+ | 0[oO][0-7_]+ | 0[bB][01_]+
+      | (?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?[jJ]?
+    )
+  | (?P<operator>[+\-*/%=<>!&|^~@]+)
+""", re.VERBOSE)
+
+# End of a triple quoted string continued from a previous block, by quote
+_STRING_END = {
+    '"': re.compile(r'(?:[^"\\]|\\.|"(?!""))*"{3}'),
+    "'": re.compile(r"(?:[^'\\]|\\.|'(?!''))*'{3}"),
+}
+
+# Characters outside the BMP take two UTF-16 code units in Qt strings
+_ASTRAL_CHAR = re.compile("[\U00010000-\U0010FFFF]")
+
+
+def _utf16_offsets(text):
+    """Map each code point index of text (and its end) to a UTF-16 offset."""
+    offsets = [0]
+    for ch in text:
+        offsets.append(offsets[-1] + (2 if ord(ch) > 0xFFFF else 1))
+    return offsets
 
 
 class PythonSyntaxHighlighter(QSyntaxHighlighter):
-    """Python syntax highlighter with beautiful color scheme."""
+    """Python syntax highlighter with beautiful color scheme.
+
+    Each block's state records whether it ends inside a triple quoted string,
+    so QSyntaxHighlighter only moves on to re-highlight the following blocks
+    while that state keeps changing.
+
+    In lazy mode (see start_lazy) only the visible blocks are highlighted right
+    away; the rest of the document is highlighted top to bottom in short chunks
+    while the event loop is idle.
+    """
+
+    # Block states
+    STATE_NORMAL = 0
+    STATE_IN_DOUBLE_TRIPLE = 1  # inside a string opened with three double quotes
+    STATE_IN_SINGLE_TRIPLE = 2  # inside a string opened with three single quotes
+
+    IDLE_CHUNK_MS = 10  # Lazy mode: highlighting time per idle chunk
+    RUN_BLOCKS = 200  # Lazy mode: blocks highlighted in one pass within a chunk
 
     def __init__(self, parent=None):
         super().__init__(parent)
+
+        # Lazy mode: blocks before this cursor are done by the idle chunks, and
+        # only they and the visible blocks are highlighted. None when not lazy.
+        # (A cursor keeps its place in the text while the user edits.)
+        self._lazy_cursor = None
+        self._visible_blocks = range(0)
+        self._skip_all = False  # Lazy mode, until the visible blocks are known
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setInterval(0)
+        self._idle_timer.timeout.connect(self._highlight_chunk)
         
         # Beautiful modern color scheme (inspired by One Dark Pro / VS Code Dark+)
         keyword_format = QTextCharFormat()
@@ -69,86 +184,157 @@ class PythonSyntaxHighlighter(QSyntaxHighlighter):
         operator_format = QTextCharFormat()
         operator_format.setForeground(QColor("#ABB2BF"))  # Light gray for operators
         
-        # Python keywords
-        keywords = [
-            "and", "as", "assert", "break", "class", "continue", "def", "del",
-            "elif", "else", "except", "False", "finally", "for", "from", "global",
-            "if", "import", "in", "is", "lambda", "None", "nonlocal", "not", "or",
-            "pass", "raise", "return", "True", "try", "while", "with", "yield"
-        ]
-        
-        # Python builtins
-        builtins = [
-            "abs", "all", "any", "ascii", "bin", "bool", "bytearray", "bytes",
-            "callable", "chr", "classmethod", "compile", "complex", "delattr",
-            "dict", "dir", "divmod", "enumerate", "eval", "exec", "filter",
-            "float", "format", "frozenset", "getattr", "globals", "hasattr",
-            "hash", "help", "hex", "id", "input", "int", "isinstance", "issubclass",
-            "iter", "len", "list", "locals", "map", "max", "memoryview", "min",
-            "next", "object", "oct", "open", "ord", "pow", "print", "property",
-            "range", "repr", "reversed", "round", "set", "setattr", "slice",
-            "sorted", "staticmethod", "str", "sum", "super", "tuple", "type",
-            "vars", "zip", "__import__"
-        ]
-        
-        # Build highlighting rules
-        self.highlighting_rules = []
-        
-        # Keywords
-        for keyword in keywords:
-            pattern = QRegularExpression(rf"\b{keyword}\b")
-            self.highlighting_rules.append((pattern, keyword_format))
-        
-        # Builtins
-        for builtin in builtins:
-            pattern = QRegularExpression(rf"\b{builtin}\b")
-            self.highlighting_rules.append((pattern, builtin_format))
-        
-        # Classes (class ClassName)
-        class_pattern = QRegularExpression(r'\bclass\s+(\w+)\s*[\(:]')
-        self.highlighting_rules.append((class_pattern, class_format))
-        
-        # Functions (def function_name)
-        function_pattern = QRegularExpression(r'\bdef\s+(\w+)\s*\(')
-        self.highlighting_rules.append((function_pattern, function_format))
-        
-        # Strings (single and double quotes, triple quotes) - more accurate regex
-        string_patterns = [
-            QRegularExpression(r'"[^"\\]*(\\.[^"\\]*)*"'),  # Double quotes
-            QRegularExpression(r"'[^'\\]*(\\.[^'\\]*)*'"),  # Single quotes
-            QRegularExpression(r'""".*?"""', QRegularExpression.PatternOption.DotMatchesEverythingOption),  # Triple double quotes
-            QRegularExpression(r"'''.*?'''", QRegularExpression.PatternOption.DotMatchesEverythingOption),  # Triple single quotes
-        ]
-        for pattern in string_patterns:
-            self.highlighting_rules.append((pattern, string_format))
-        
-        # Comments
-        comment_pattern = QRegularExpression(r'#.*$')
-        self.highlighting_rules.append((comment_pattern, comment_format))
-        
-        # Numbers (integers and floats)
-        number_pattern = QRegularExpression(r'\b\d+\.?\d*[eE]?[+-]?\d*\b')
-        self.highlighting_rules.append((number_pattern, number_format))
-        
-        # Operators
-        operator_pattern = QRegularExpression(r'[+\-*/%=<>!&|^~]+')
-        self.highlighting_rules.append((operator_pattern, operator_format))
+        self.formats = {
+            "keyword": keyword_format,
+            "builtin": builtin_format,
+            "class": class_format,
+            "function": function_format,
+            "string": string_format,
+            "comment": comment_format,
+            "number": number_format,
+            "operator": operator_format,
+        }
+
+    @property
+    def lazy(self):
+        """True while lazy mode still has blocks left to highlight."""
+        return self._lazy_cursor is not None
+
+    def start_lazy(self):
+        """Switch to lazy mode; call before replacing the document's text.
+
+        Nothing is highlighted until set_visible_blocks() reports what is on
+        screen, which also starts the idle-time chunks.
+        """
+        self._lazy_cursor = QTextCursor(self.document())
+        self._lazy_cursor.setKeepPositionOnInsert(True)  # Stay before the new text
+        self._visible_blocks = range(0)
+        self._skip_all = True
+
+    def stop_lazy(self):
+        """Leave lazy mode; later changes are highlighted as usual."""
+        self._lazy_cursor = None
+        self._skip_all = False
+        self._idle_timer.stop()
+
+    def set_visible_blocks(self, first, last):
+        """Lazy mode: highlight blocks first..last (block numbers) now."""
+        if self._lazy_cursor is None:
+            return
+        self._skip_all = False
+        if not self._idle_timer.isActive():
+            self._idle_timer.start()
+        shown = self._visible_blocks
+        self._visible_blocks = range(first, last + 1)
+        done = self._lazy_cursor.position()
+        if self._lazy_cursor.block().blockNumber() > last:
+            return  # The idle chunks have already been past these blocks
+        block = self.document().findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            if block.position() >= done and block.blockNumber() not in shown:
+                self.rehighlightBlock(block)
+            block = block.next()
+
+    def _highlight_chunk(self):
+        """Lazy mode: highlight the next runs of blocks in order for one idle time slice.
+
+        The cursor is moved past a run first, so that re-highlighting its first
+        block makes Qt carry on through the run in one pass: each block not
+        highlighted yet has state -1, so its state changes. Qt stops where the
+        state no longer changes, e.g. at a visible block that is already done, so
+        the run is walked for any block still at -1.
+        """
+        cursor = self._lazy_cursor
+        clock = QElapsedTimer()
+        clock.start()
+        while cursor is not None and clock.elapsed() < self.IDLE_CHUNK_MS:
+            block = end = cursor.block()
+            for _ in range(self.RUN_BLOCKS):
+                end = end.next()
+            if end.isValid():
+                cursor.setPosition(end.position())
+            else:
+                self.stop_lazy()  # Last run: everything is highlighted from now on
+                cursor = None
+            while block.isValid() and block != end:
+                if block.userState() == -1:
+                    self.rehighlightBlock(block)
+                block = block.next()
 
     def highlightBlock(self, text):
-        """Apply syntax highlighting to a block of text."""
-        for pattern, format in self.highlighting_rules:
-            expression = QRegularExpression(pattern)
-            iterator = expression.globalMatch(text)
-            while iterator.hasNext():
-                match = iterator.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), format)
+        """Apply syntax highlighting to a block of text in one left-to-right scan."""
+        if self._skip_all:
+            return
+        if self._lazy_cursor is not None:
+            block = self.currentBlock()
+            if (block.position() >= self._lazy_cursor.position()
+                    and block.blockNumber() not in self._visible_blocks):
+                # Not reached yet; leaving the block state alone also stops Qt
+                # from carrying on to the next block
+                return
+        formats = self.formats
+        # Qt positions count UTF-16 code units; re counts code points
+        offsets = None if _ASTRAL_CHAR.search(text) is None else _utf16_offsets(text)
+        state = self.STATE_NORMAL
+        pos = 0
+
+        previous = self.previousBlockState()
+        if previous in (self.STATE_IN_DOUBLE_TRIPLE, self.STATE_IN_SINGLE_TRIPLE):
+            quote = '"' if previous == self.STATE_IN_DOUBLE_TRIPLE else "'"
+            match = _STRING_END[quote].match(text)
+            if match is None:
+                # The whole block is inside the string
+                self.setFormat(0, len(text) if offsets is None else offsets[-1], formats["string"])
+                self.setCurrentBlockState(previous)
+                return
+            pos = match.end()
+            self.setFormat(0, pos if offsets is None else offsets[pos], formats["string"])
+
+        name_kind = None  # "class"/"function" right after the class/def keyword
+        for match in _TOKEN_PATTERN.finditer(text, pos):
+            kind = match.lastgroup
+            if kind == "open_string":
+                quote = match.group().lstrip("rRbBuUfF")[0]
+                state = (self.STATE_IN_DOUBLE_TRIPLE if quote == '"'
+                         else self.STATE_IN_SINGLE_TRIPLE)
+                kind = "string"
+            if kind == "name":
+                word = match.group()
+                if name_kind is not None:
+                    kind = name_kind
+                elif word in _KEYWORDS:
+                    kind = "keyword"
+                elif word in _BUILTINS:
+                    kind = "builtin"
+                else:
+                    name_kind = None
+                    continue
+                name_kind = _DEFINITION_KEYWORDS.get(word) if kind == "keyword" else None
+            else:
+                name_kind = None
+            start, end = match.span()
+            if offsets is not None:
+                start, end = offsets[start], offsets[end]
+            self.setFormat(start, end - start, formats[kind])
+        self.setCurrentBlockState(state)
 
 
 class Editor(QPlainTextEdit):
-    """Code editor with syntax highlighting and smart indentation."""
+    """Code editor with syntax highlighting and smart indentation.
+
+    Text larger than lazy_highlight_threshold characters is highlighted lazily,
+    and text larger than plain_text_threshold is shown without highlighting.
+    """
 
-    def __init__(self, font_size=13):
+    LAZY_HIGHLIGHT_THRESHOLD = 200_000
+    PLAIN_TEXT_THRESHOLD = 5_000_000
+    HIGHLIGHT_MARGIN = 50  # Blocks above/below the viewport highlighted eagerly
+
+    def __init__(self, font_size=13, lazy_highlight_threshold=LAZY_HIGHLIGHT_THRESHOLD,
+                 plain_text_threshold=PLAIN_TEXT_THRESHOLD):
         super().__init__()
+        self.lazy_highlight_threshold = lazy_highlight_threshold
+        self.plain_text_threshold = plain_text_threshold
         font = QFont("Menlo, Monaco, Consolas, monospace", font_size)
         font.setStyleHint(QFont.Monospace)
         self.setFont(font)
@@ -158,7 +344,11 @@ class Editor(QPlainTextEdit):
         
         # Enable undo/redo (enabled by default, but make sure)
         self.setUndoRedoEnabled(True)
-        
+
+        # Enable syntax highlighting
+        self.highlighter = PythonSyntaxHighlighter(self.document())
+        self.verticalScrollBar().valueChanged.connect(self._update_visible_blocks)
+
         self.setPlainText('print("Hello, World!")\n')
         
         # Beautiful dark theme styling
@@ -173,9 +363,6 @@ class Editor(QPlainTextEdit):
             }
         """)
         
-        # Enable syntax highlighting
-        self.highlighter = PythonSyntaxHighlighter(self.document())
-        
         # Set tab width to 4 spaces (Python standard)
         self.setTabStopDistance(4 * self.fontMetrics().horizontalAdvance(' '))
         
@@ -183,6 +370,41 @@ class Editor(QPlainTextEdit):
         self.cursorPositionChanged.connect(self.highlight_current_line)
         self.highlight_current_line()
     
+    def setPlainText(self, text):
+        """Replace the text, highlighting it lazily or not at all if it is large."""
+        size = len(text)
+        highlighter = self.highlighter
+        if size > self.plain_text_threshold:
+            highlighter.stop_lazy()
+            highlighter.setDocument(None)
+        else:
+            if highlighter.document() is None:
+                highlighter.setDocument(self.document())
+            if size > self.lazy_highlight_threshold:
+                highlighter.start_lazy()
+            else:
+                highlighter.stop_lazy()
+        super().setPlainText(text)
+        self._update_visible_blocks()
+
+    def _update_visible_blocks(self):
+        """Tell a lazy highlighter which blocks are on screen."""
+        if not self.highlighter.lazy:
+            return
+        first = self.firstVisibleBlock().blockNumber()
+        lines = self.viewport().height() // max(self.fontMetrics().lineSpacing(), 1) + 1
+        margin = self.HIGHLIGHT_MARGIN
+        self.highlighter.set_visible_blocks(max(first - margin, 0), first + lines + margin)
+
+    def go_to_line(self, line):
+        """Put the cursor at the start of a 1-based line and show it."""
+        block = self.document().findBlockByNumber(line - 1)
+        if not block.isValid():
+            return
+        self.setTextCursor(QTextCursor(block))
+        self.centerCursor()
+        self.setFocus()
+
     def set_font_size(self, size):
         """Set font size and update tab width."""
         self._base_font_size = size
@@ -190,6 +412,12 @@ class Editor(QPlainTextEdit):
         font.setStyleHint(QFont.Monospace)
         self.setFont(font)
         self.setTabStopDistance(4 * self.fontMetrics().horizontalAdvance(' '))
+        self._update_visible_blocks()  # More or fewer lines fit now
+
+    def resizeEvent(self, event):
+        """Highlight blocks a larger viewport has brought on screen."""
+        super().resizeEvent(event)
+        self._update_visible_blocks()
 
     def highlight_current_line(self):
         """Highlight the current line."""
@@ -263,10 +491,33 @@ class Editor(QPlainTextEdit):
         super().keyPressEvent(event)
 
 
+# A traceback frame in the code being run, which python -c calls "<string>"
+_TRACEBACK_FRAME = re.compile(r'\s*(?P<frame>File "<string>", line (?P<line>\d+))')
+
+
 class Terminal(QPlainTextEdit):
-    """Interactive terminal with input support."""
+    """Interactive terminal with input support.
+
+    Only the last scrollback lines are kept: the document drops its oldest
+    blocks (maximumBlockCount), so a program printing in an endless loop does not
+    grow memory or slow appends down without bound.
+
+    Program output (write_output) is queued and inserted at most once per frame.
+    Beyond rate_limit lines per second the rest is collapsed into a
+    "N lines suppressed" marker, which shows the lines when clicked. Traceback
+    frames of the code being run become links to the line (line_activated).
+    """
 
-    def __init__(self, font_size=12):
+    line_activated = Signal(int)  # a traceback link to this line of the code was clicked
+
+    SCROLLBACK_LINES = 10000
+    FRAME_MS = 16
+    RATE_LIMIT = 5000  # Output lines shown per second (0 = no limit)
+    COLLAPSED_KEPT = 10  # Most recent collapsed chunks whose lines are kept
+    COLLAPSED_SCHEME = "pide-collapsed:"  # Anchor href prefix of the markers
+    LINE_SCHEME = "pide-line:"  # Anchor href prefix of traceback line links
+
+    def __init__(self, font_size=12, scrollback=SCROLLBACK_LINES, rate_limit=RATE_LIMIT):
         super().__init__()
         font = QFont("Menlo, Monaco, Consolas, monospace", font_size)
         font.setStyleHint(QFont.Monospace)
@@ -283,9 +534,46 @@ class Terminal(QPlainTextEdit):
                 selection-color: #FFFFFF;
             }
         """)
+        self.set_scrollback(scrollback)
+        # Marks where the user's input starts. A cursor follows the text when old
+        # lines are trimmed from the top; text typed at the mark stays after it.
+        self._input_start = QTextCursor(self.document())
+        self._input_start.setKeepPositionOnInsert(True)
         self.input_start_pos = 0
         self.process = None
 
+        # Output waiting for the next frame
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FRAME_MS)
+        self._flush_timer.timeout.connect(self._flush_output)
+        self._plain_format = QTextCharFormat()
+
+        # Rate limiting: lines shown in the current one-second window, and the
+        # lines being collapsed while over the limit
+        self.rate_limit = rate_limit
+        self._rate_clock = QElapsedTimer()
+        self._rate_lines = 0
+        self._suppressed = None  # deque of the latest suppressed lines
+        self._suppressed_count = 0
+        self._collapsed = {}  # marker id -> (kept lines, number of lines dropped)
+        self._next_marker = 0
+        self.viewport().setMouseTracking(True)  # Pointing hand over markers
+
+    @property
+    def input_start_pos(self):
+        """Position where the user's input starts; text before it is output."""
+        return self._input_start.position()
+
+    @input_start_pos.setter
+    def input_start_pos(self, pos):
+        self._input_start.setPosition(pos)
+
+    def set_scrollback(self, lines):
+        """Keep at most lines lines of output (0 = unlimited)."""
+        self.setMaximumBlockCount(lines)
+
     def set_process(self, process):
         """Set the process to send input to."""
         self.process = process
@@ -350,17 +638,125 @@ class Terminal(QPlainTextEdit):
             super().keyPressEvent(event)
 
     def appendPlainText(self, text: str):
-        """Append text and update input position."""
-        super().appendPlainText(text)
-        # Update input position to end of text
-        cursor = self.textCursor()
+        """Append text after any queued output and update input position."""
+        self._flush_output()
+        self._end_collapse()
+        self._append_lines([text])
+
+    def write_output(self, lines):
+        """Queue lines of program output to be shown on the next frame."""
+        self._pending.extend(lines)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_output(self):
+        """Show the queued output, collapsing lines over the rate limit."""
+        self._flush_timer.stop()
+        lines, self._pending = self._pending, []
+        if self.rate_limit > 0:
+            if not self._rate_clock.isValid() or self._rate_clock.elapsed() >= 1000:
+                self._rate_clock.start()
+                self._rate_lines = 0
+                self._end_collapse()
+            allowed = max(self.rate_limit - self._rate_lines, 0)
+            if len(lines) > allowed:
+                self._collapse(lines[allowed:])
+                del lines[allowed:]
+            self._rate_lines += len(lines)
+        if lines:
+            self._append_lines(lines)
+            self._link_traceback_frames(lines)
+        if self._suppressed is not None:
+            # Keep checking so the marker appears once the window is over,
+            # even if the program goes quiet
+            self._flush_timer.start()
+
+    def _append_lines(self, lines, char_format=None):
+        """Append lines as new blocks with one insertion; input starts after them."""
+        cursor = QTextCursor(self.document())
         cursor.movePosition(QTextCursor.MoveOperation.End)
+        text = "\n".join(lines)
+        if not self.document().isEmpty():
+            text = "\n" + text
+        cursor.insertText(text, char_format or self._plain_format)
         self.input_start_pos = cursor.position()
         # Keep cursor at end for input
         self.setTextCursor(cursor)
 
+    def _link_traceback_frames(self, lines):
+        """Turn traceback frames among the lines just appended into line links."""
+        doc = self.document()
+        first = doc.blockCount() - len(lines)  # Block number of lines[0]
+        for i, line in enumerate(lines):
+            if '"<string>"' not in line or first + i < 0:
+                continue
+            match = _TRACEBACK_FRAME.match(line)
+            if match is None:
+                continue
+            char_format = QTextCharFormat()
+            char_format.setAnchor(True)
+            char_format.setAnchorHref(f"{self.LINE_SCHEME}{match.group('line')}")
+            char_format.setForeground(QColor("#61AFEF"))
+            char_format.setFontUnderline(True)
+            position = doc.findBlockByNumber(first + i).position()
+            cursor = QTextCursor(doc)
+            cursor.setPosition(position + match.start("frame"))
+            cursor.setPosition(position + match.end("frame"), QTextCursor.MoveMode.KeepAnchor)
+            cursor.mergeCharFormat(char_format)
+
+    def _collapse(self, lines):
+        if self._suppressed is None:
+            self._suppressed = deque(maxlen=self.maximumBlockCount() or self.SCROLLBACK_LINES)
+            self._suppressed_count = 0
+        self._suppressed.extend(lines)
+        self._suppressed_count += len(lines)
+
+    def _end_collapse(self):
+        """Show a marker for the lines collapsed so far, if any."""
+        if self._suppressed is None:
+            return
+        marker = self._next_marker
+        self._next_marker += 1
+        kept = list(self._suppressed)
+        self._collapsed[marker] = (kept, self._suppressed_count - len(kept))
+        if len(self._collapsed) > self.COLLAPSED_KEPT:
+            del self._collapsed[next(iter(self._collapsed))]
+        char_format = QTextCharFormat()
+        char_format.setAnchor(True)
+        char_format.setAnchorHref(f"{self.COLLAPSED_SCHEME}{marker}")
+        char_format.setForeground(QColor("#61AFEF"))
+        char_format.setFontItalic(True)
+        count = self._suppressed_count
+        self._suppressed = None
+        self._append_lines([f"... {count} lines suppressed (click to show) ..."], char_format)
+
+    def _expand(self, href, cursor):
+        """Replace a collapsed-output marker with the lines it stands for."""
+        entry = self._collapsed.pop(int(href[len(self.COLLAPSED_SCHEME):]), None)
+        if entry is None:
+            return
+        kept, dropped = entry
+        lines = ([f"... {dropped} earlier lines not kept ..."] if dropped else []) + kept
+        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText("\n".join(lines), self._plain_format)
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        super().mouseMoveEvent(event)
+        anchor = self.anchorAt(event.position().toPoint())
+        self.viewport().setCursor(Qt.PointingHandCursor if anchor else Qt.IBeamCursor)
+
     def mousePressEvent(self, event: QMouseEvent):
         """Handle mouse clicks - allow selection for copying."""
+        if event.button() == Qt.MouseButton.LeftButton:
+            point = event.position().toPoint()
+            anchor = self.anchorAt(point)
+            if anchor.startswith(self.COLLAPSED_SCHEME):
+                self._expand(anchor, self.cursorForPosition(point))
+                return
+            if anchor.startswith(self.LINE_SCHEME):
+                self.line_activated.emit(int(anchor[len(self.LINE_SCHEME):]))
+                return
         super().mousePressEvent(event)
         # Allow selection even before input_start_pos (for copying)
         # Only restrict cursor position if not selecting and it's a left click
@@ -383,9 +779,14 @@ class Terminal(QPlainTextEdit):
         self.setFont(font)
     
     def clear(self):
-        """Clear terminal and reset input position."""
+        """Clear terminal and reset input position and queued output."""
         super().clear()
         self.input_start_pos = 0
+        self._pending = []
+        self._flush_timer.stop()
+        self._rate_clock.invalidate()
+        self._suppressed = None
+        self._collapsed = {}
 
 
 class FileTree(QWidget):
@@ -393,7 +794,7 @@ class FileTree(QWidget):
 
     file_selected = None  # Will be set as signal
 
-    def __init__(self):
+    def __init__(self, root=PIDE_HOME):
         super().__init__()
         layout = QVBoxLayout(self)
         layout.setContentsMargins(4, 4, 4, 4)
@@ -409,21 +810,14 @@ class FileTree(QWidget):
         """)
         layout.addWidget(label)
 
-        # File system model
-        self.model = QFileSystemModel()
-        self.model.setRootPath(str(PIDE_HOME))
-        self.model.setNameFilters(["*.py"])
-        self.model.setNameFilterDisables(False)
+        # File system model, created by load() so startup does not wait for
+        # the directory scan
+        self.root = root
+        self.model = None
 
         # Tree view
         self.tree = QTreeView()
-        self.tree.setModel(self.model)
-        self.tree.setRootIndex(self.model.index(str(PIDE_HOME)))
         self.tree.setHeaderHidden(True)
-        # Hide size, type, date columns
-        self.tree.hideColumn(1)
-        self.tree.hideColumn(2)
-        self.tree.hideColumn(3)
         self.tree.setAnimated(True)
         self.tree.doubleClicked.connect(self._on_double_click)
         self.tree.clicked.connect(self._on_single_click)
@@ -469,6 +863,22 @@ class FileTree(QWidget):
             }
         """)
 
+    def load(self):
+        """Create the file system model and show the tree; does nothing once loaded."""
+        if self.model is not None:
+            return
+        self.model = QFileSystemModel()
+        self.model.setRootPath(str(self.root))
+        self.model.setNameFilters(["*.py"])
+        self.model.setNameFilterDisables(False)
+        self.tree.setModel(self.model)
+        self.tree.setRootIndex(self.model.index(str(self.root)))
+        # Hide size, type, date columns
+        self.tree.hideColumn(1)
+        self.tree.hideColumn(2)
+        self.tree.hideColumn(3)
+        self.highlight_file(self.current_file_path)
+
     def _on_single_click(self, index):
         """Track clicked file for new file creation."""
         path = self.model.filePath(index)
@@ -484,6 +894,18 @@ class FileTree(QWidget):
             if self.file_selected:
                 self.file_selected(path)
     
+    def refresh_file(self, file_path):
+        """Repaint the row of a file that was just written.
+
+        QFileSystemModel watches the directories it has loaded and picks up new
+        and changed files by itself, so only this row needs repainting.
+        """
+        if self.model is None:
+            return  # Not loaded yet; load() reads the directory as it is
+        index = self.model.index(file_path)
+        if index.isValid():
+            self.tree.update(index)
+
     def highlight_file(self, file_path):
         """Highlight the currently open file in the tree."""
         if not file_path:
@@ -492,6 +914,8 @@ class FileTree(QWidget):
             return
         
         self.current_file_path = file_path
+        if self.model is None:
+            return  # load() highlights it
         file_index = self.model.index(file_path)
         
         if file_index.isValid():
@@ -508,224 +932,876 @@ class FileTree(QWidget):
             self.tree.scrollTo(file_index, QTreeView.ScrollHint.EnsureVisible)
 
 
-class TurtleCanvas(QGraphicsView):
-    """Canvas for rendering turtle graphics."""
+class OutputReader(QObject):
+    """Parses the running program's output off the GUI thread.
+
+    Lives in its own QThread. A QProcess can only be read on the thread that owns
+    it, so MainWindow forwards raw stdout/stderr chunks here, while the turtle
+    graphics pipe is read here directly. Terminal lines and decoded turtle
+    commands are handed back through batch_ready at most once per frame.
+    """
+
+    batch_ready = Signal(int, object, object)  # generation, terminal lines, turtle commands
+    run_finished = Signal(int, int)  # generation, exit code
+
+    FRAME_MS = 16
 
     def __init__(self):
         super().__init__()
-        self.scene = QGraphicsScene()
-        self.setScene(self.scene)
-        self.setRenderHint(QPainter.Antialiasing)
-        self.setBackgroundBrush(QBrush(QColor("white")))
-        self.setStyleSheet("border: none;")
-        
-        # Set alignment to center
-        self.setAlignment(Qt.AlignCenter)
-        
-        # Set scene rect to a reasonable default size
-        self.scene.setSceneRect(-400, -400, 800, 800)
+        self._generation = -1
+        self._multiplexed = True  # turtle commands arrive as prefixed stdout lines
+        # Bytes of an incomplete stdout line; split at b"\n" before decoding
+        self._stdout_buffer = bytearray()
+        self._stdout_decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._stderr_decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._stderr_buffer = ""
+        self._in_stderr = False  # the last terminal line queued came from stderr
+        self._decoder = turtle_protocol.Decoder()
+        self._graphics_fd = None
+        self._notifier = None
+        self._throttled = False  # the GUI has asked to stop reading graphics for now
+        self._text = []
+        self._cmds = []
+        self._timer = None  # created on first use so it lives in the reader thread
+
+    @Slot(int, int)
+    def start(self, generation, graphics_fd):
+        """Begin parsing a new run; graphics_fd is the graphics pipe read end or -1."""
+        self.stop()
+        self._generation = generation
+        self._multiplexed = graphics_fd < 0
+        if graphics_fd >= 0:
+            self._graphics_fd = graphics_fd
+            self._notifier = QSocketNotifier(graphics_fd, QSocketNotifier.Type.Read, self)
+            self._notifier.activated.connect(self._on_graphics)
+            self._notifier.setEnabled(not self._throttled)
+
+    @Slot(bool)
+    def throttle(self, throttled):
+        """Stop or resume reading the graphics pipe.
+
+        While it is not read the pipe fills up and the program blocks on its
+        next drawing command, so a backlog of playback holds the program back.
+        """
+        self._throttled = throttled
+        if self._notifier is not None:
+            self._notifier.setEnabled(not throttled)
+
+    @Slot()
+    def stop(self):
+        """Discard the current run's pending output and close its graphics pipe."""
+        self._close_graphics()
+        self._generation = -1
+        self._stdout_buffer.clear()
+        self._stdout_decoder.reset()
+        self._stderr_decoder.reset()
+        self._stderr_buffer = ""
+        self._in_stderr = False
+        self._decoder = turtle_protocol.Decoder()
+        self._text = []
+        self._cmds = []
+
+    @Slot(int, object)
+    def feed_stdout(self, generation, data):
+        """Split a raw stdout chunk into terminal lines and turtle commands.
+
+        Bytes are buffered until a newline arrives, so only complete lines are
+        decoded (a UTF-8 character never contains the newline byte) and a long
+        partial line is extended in place rather than re-concatenated.
+        """
+        if generation != self._generation:
+            return
+        buffer = self._stdout_buffer
+        buffer += data
+        end = buffer.rfind(b"\n")
+        if end < 0:
+            return
+        with memoryview(buffer) as view, view[:end] as complete:
+            text = self._stdout_decoder.decode(complete)
+        del buffer[:end + 1]
+        lines = text.split("\n")
+        queued = len(self._text)
+        if not self._multiplexed:
+            # Graphics have their own pipe, so stdout is plain program output
+            self._text.extend(line for line in lines if line.strip())
+        else:
+            for line in lines:
+                if line.startswith(turtle_protocol.BINARY_PREFIX):
+                    try:
+                        frame = base64.b64decode(line[len(turtle_protocol.BINARY_PREFIX):])
+                    except binascii.Error:
+                        continue
+                    self._decode_frame(frame)
+                elif line.startswith(turtle_protocol.JSON_PREFIX):
+                    try:
+                        self._cmds.append(json.loads(line[len(turtle_protocol.JSON_PREFIX):]))
+                    except json.JSONDecodeError:
+                        pass
+                elif line.strip():
+                    self._text.append(line)
+        if len(self._text) > queued:
+            self._in_stderr = False
+        self._schedule()
+
+    @Slot(int, object)
+    def feed_stderr(self, generation, data):
+        """Queue the complete lines of a raw stderr chunk for the terminal.
+
+        Decoding is incremental, so characters and lines split between chunks
+        are kept until the rest arrives.
+        """
+        if generation != self._generation:
+            return
+        self._stderr_buffer += self._stderr_decoder.decode(data)
+        lines = self._stderr_buffer.split("\n")
+        self._stderr_buffer = lines.pop()
+        self._queue_stderr(lines)
+        self._schedule()
+
+    def _queue_stderr(self, lines):
+        """Queue stderr lines, marking where a run of error output starts."""
+        for line in lines:
+            line = line.rstrip("\r")
+            if not self._in_stderr:
+                line = f"[ERROR] {line}"
+                self._in_stderr = True
+            self._text.append(line)
+
+    @Slot(int, int)
+    def finish(self, generation, exit_code):
+        """Drain what a finished run left behind, then report it."""
+        if generation != self._generation:
+            return
+        if self._graphics_fd is not None:
+            while data := self._read_graphics():
+                self._decode_frame(data)
+        tail = self._stdout_decoder.decode(self._stdout_buffer, final=True)
+        self._stdout_buffer.clear()
+        if tail.strip():
+            self._text.append(tail.rstrip())
+        self._stderr_buffer += self._stderr_decoder.decode(b"", final=True)
+        if self._stderr_buffer.strip():
+            self._queue_stderr([self._stderr_buffer.rstrip()])
+        self._stderr_buffer = ""
+        self._flush()
+        self.run_finished.emit(generation, exit_code)
+        self.stop()
+
+    def _close_graphics(self):
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+        if self._graphics_fd is not None:
+            os.close(self._graphics_fd)
+            self._graphics_fd = None
+
+    def _read_graphics(self):
+        """Read available bytes from the graphics pipe; returns b"" at EOF, None if empty."""
+        try:
+            return os.read(self._graphics_fd, 1 << 16)
+        except BlockingIOError:
+            return None
+
+    def _on_graphics(self):
+        data = self._read_graphics()
+        if data is None:
+            return
+        if not data:
+            self._close_graphics()
+            return
+        self._decode_frame(data)
+        self._schedule()
+
+    def _decode_frame(self, data):
+        """Decode binary turtle records into pending commands."""
+        try:
+            self._cmds.extend(self._decoder.feed(data))
+        except (struct.error, ValueError, IndexError):
+            pass
+
+    def _schedule(self):
+        """Make sure pending output is flushed within one frame."""
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._timer.setInterval(self.FRAME_MS)
+            self._timer.timeout.connect(self._flush)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _flush(self):
+        """Hand pending terminal lines and turtle commands to the GUI thread."""
+        if self._text or self._cmds:
+            text, cmds = self._text, self._cmds
+            self._text = []
+            self._cmds = []
+            self.batch_ready.emit(self._generation, text, cmds)
+
+
+class FileWriter(QObject):
+    """Writes files off the GUI thread, for autosave and explicit saves alike.
+
+    Lives in its own QThread; writes are handled in the order they were asked
+    for. A write is skipped if its text hashes the same as what was last written
+    to that path and the file has not changed on disk since. Files are replaced
+    atomically: the text goes to a temporary file next to the target, which is
+    synced and then renamed over it, so a crash mid-write leaves the previous
+    version intact.
+    """
+
+    saved = Signal(str)  # path; only emitted when the file was actually written
+    failed = Signal(str, str)  # path, error message
 
-        # Turtle state
-        self.turtles = {}  # id -> (x, y, heading, visible, color)
-        self._turtle_cursors = {}  # id -> QGraphicsPolygonItem (cursor triangle)
+    def __init__(self):
+        super().__init__()
+        self._written = {}  # path -> (digest of the text last written there, _file_state)
 
-        # Flip Y axis (turtle uses math coordinates)
-        self.setTransform(QTransform().scale(1, -1))
-        
-        # Track if we need to fit view
-        self._auto_fit = True
-
-    def _triangle_points(self, x, y, heading_deg, size=14):
-        """Return 3 (x,y) points for turtle triangle; tip in heading direction."""
-        rad = math.radians(heading_deg)
-        c, s = math.cos(rad), math.sin(rad)
-        # Local: tip (1,0), back (-1, -0.4), (-1, 0.4); scale by size/2
-        h = size / 2
-        return [
-            (x + h * c, y + h * s),
-            (x + h * (-c - 0.4 * s), y + h * (-s + 0.4 * c)),
-            (x + h * (-c + 0.4 * s), y + h * (-s - 0.4 * c)),
-        ]
-
-    def _draw_turtle_cursor(self, x, y, heading, color):
-        """Draw one turtle cursor triangle; returns the graphics item."""
-        points = self._triangle_points(x, y, heading)
-        polygon = QPolygonF([QPointF(a, b) for a, b in points])
-        brush = QBrush(QColor(color))
-        pen = QPen(QColor("black"))
-        pen.setWidthF(0.5)
-        item = self.scene.addPolygon(polygon, pen, brush)
-        item.setZValue(1000)
-        return item
+    @Slot(str, str)
+    def write(self, path, text):
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass")).digest()
+        if self._written.get(path) == (digest, self._file_state(path)):
+            return
+        try:
+            self._replace(path, text)
+        except (OSError, UnicodeError) as e:
+            self.failed.emit(path, str(e))
+            return
+        self._written[path] = (digest, self._file_state(path))
+        self.saved.emit(path)
+
+    @staticmethod
+    def _file_state(path):
+        """What tells whether a file has been changed by someone else; None if missing."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    @Slot()
+    def sync(self):
+        """Return once earlier writes are done (called as a blocking queued call)."""
+
+    @staticmethod
+    def _replace(path, text):
+        target = os.path.realpath(path)  # Replace a symlink's target, not the link
+        directory, name = os.path.split(target)
+        temp = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            with open(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.chmod(temp, os.stat(target).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            os.replace(temp, target)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+
+
+class EditJournal:
+    """Append-only log of the editor buffer's edits, for recovery after a crash.
+
+    There is one journal file per buffer in JOURNAL_DIR, named after the buffer's
+    path; an untitled buffer has its own. The first line is a JSON snapshot,
+    {"path": path or null, "text": text}, written at the first edit. Each
+    later edit appends one line, [position, chars removed, inserted text], as
+    reported by QTextDocument.contentsChange. Appends are buffered and only
+    reach the file when flush() is called, once typing pauses, so a keystroke
+    costs no disk write. After COMPACT_RECORDS edits, compact() rewrites the
+    journal as a single snapshot. Once a buffer is saved its journal is
+    discarded.
+    """
+
+    COMPACT_RECORDS = 1000
+
+    def __init__(self, directory=JOURNAL_DIR):
+        self.directory = Path(directory)
+        self.path = None  # Buffer being journaled; None for an untitled one
+        self._active = False
+        self._file = None
+        self._records = 0
+
+    def journal_file(self, path):
+        key = hashlib.blake2b(str(path).encode("utf-8"), digest_size=8).hexdigest() if path else "untitled"
+        return self.directory / f"{key}.journal"
+
+    def begin(self, path):
+        """Start journaling the buffer for path; nothing is written until it changes."""
+        self.end()
+        self.path = path
+        self._active = True
+
+    def end(self):
+        """Stop journaling; the journal stays on disk until discarded."""
+        self._active = False
+        self._close()
+
+    def rename(self, path, document):
+        """The buffer now belongs to path (Save As): move its journal along."""
+        old = self.journal_file(self.path)
+        had_journal = self._file is not None
+        self.begin(path)
+        if had_journal:
+            self.snapshot(document)
+            old.unlink(missing_ok=True)
+
+    def record(self, document, position, removed, added):
+        """Append an edit reported by document's contentsChange."""
+        if not self._active:
+            return
+        try:
+            if self._file is None:
+                self._write_snapshot(document.toPlainText())
+                return
+            cursor = QTextCursor(document)
+            cursor.setPosition(position)
+            cursor.setPosition(min(position + added, document.characterCount() - 1), QTextCursor.KeepAnchor)
+            text = cursor.selectedText().replace("\u2029", "\n")
+            self._file.write(json.dumps([position, removed, text], ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._records += 1
+        except OSError:
+            self._close()  # Journaling is best effort; the next edit starts over
+
+    def flush(self):
+        """Write the edits appended since the last flush to the journal file."""
+        if self._file is not None:
+            try:
+                self._file.flush()
+            except OSError:
+                self._close()
+
+    def compact(self, document):
+        """Rewrite the journal as one snapshot once it has COMPACT_RECORDS edits."""
+        if self._file is not None and self._records >= self.COMPACT_RECORDS:
+            self.snapshot(document)
+
+    def discard(self, path):
+        """Delete the journal of the buffer for path (None: the untitled buffer)."""
+        if path == self.path:
+            self._close()  # The next edit starts a new journal
+        try:
+            self.journal_file(path).unlink()
+        except OSError:
+            pass
+
+    def recover(self):
+        """Return [(path or None, text, mtime)] replayed from journals left behind."""
+        buffers = []
+        for journal in self.directory.glob("*.journal"):
+            try:
+                buffers.append((*self.replay(journal), journal.stat().st_mtime))
+            except (OSError, ValueError, KeyError, IndexError, TypeError):
+                continue
+        return buffers
+
+    @staticmethod
+    def replay(journal):
+        """Return (path or None, text) from a journal file."""
+        with open(journal, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        header = json.loads(lines[0])
+        document = QTextDocument()
+        document.setPlainText(header["text"])
+        cursor = QTextCursor(document)
+        for line in lines[1:]:
+            if not line:
+                continue
+            try:
+                position, removed, text = json.loads(line)
+            except ValueError:
+                break  # Cut short by the crash
+            end = document.characterCount() - 1
+            cursor.setPosition(min(position, end))
+            cursor.setPosition(min(position + removed, end), QTextCursor.KeepAnchor)
+            cursor.insertText(text)
+        return header["path"], document.toPlainText()
+
+    def snapshot(self, document):
+        """Write the buffer's whole text as its journal."""
+        try:
+            self._write_snapshot(document.toPlainText())
+        except OSError:
+            self._close()
+
+    def _write_snapshot(self, text):
+        self._close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        journal = self.journal_file(self.path)
+        temp = journal.with_suffix(".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"path": self.path, "text": text}, ensure_ascii=False) + "\n")
+        os.replace(temp, journal)
+        self._file = open(journal, "a", encoding="utf-8")
+        self._records = 0
+
+    def _close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass  # The buffered edits are lost; the buffer itself is not
+            self._file = None
 
-    def clear(self):
-        """Clear the canvas."""
-        self.scene.clear()
-        self.turtles = {}
-        self._turtle_cursors = {}
-        self.setBackgroundBrush(QBrush(QColor("white")))
-        # Reset scene rect
-        self.scene.setSceneRect(-400, -400, 800, 800)
-        self._center_view()
-    
-    def _update_view(self):
-        """Update view to fit all items and keep centered."""
-        if self.scene.items():
-            # Get bounding rect of all items
-            rect = self.scene.itemsBoundingRect()
-            # Add some padding
-            rect.adjust(-50, -50, 50, 50)
-            self.scene.setSceneRect(rect)
-            # Fit view while maintaining aspect ratio
-            self.fitInView(rect, Qt.AspectRatioMode.KeepAspectRatio)
-    
-    def _center_view(self):
-        """Center the view on the scene."""
-        self._update_view()
-    
-    def resizeEvent(self, event):
-        """Handle resize to keep view centered."""
-        super().resizeEvent(event)
-        if self._auto_fit:
-            self._center_view()
-
-    def set_bgcolor(self, color):
-        """Set background color."""
-        self.setBackgroundBrush(QBrush(QColor(color)))
-
-    def draw_line(self, x1, y1, x2, y2, color, width):
-        """Draw a line."""
-        pen = QPen(QColor(color))
-        pen.setWidthF(width)
-        pen.setCapStyle(Qt.RoundCap)
-        self.scene.addLine(x1, y1, x2, y2, pen)
-        # Update view to include new line
-        self._update_view()
-
-    def draw_dot(self, x, y, size, color):
-        """Draw a dot."""
-        brush = QBrush(QColor(color))
-        pen = QPen(Qt.NoPen)
-        r = size / 2
-        self.scene.addEllipse(x - r, y - r, size, size, pen, brush)
-        # Update view to include new dot
-        self._update_view()
-
-    def draw_fill(self, points, color):
-        """Draw a filled polygon."""
-        polygon = QPolygonF([QPointF(x, y) for x, y in points])
-        brush = QBrush(QColor(color))
-        pen = QPen(Qt.NoPen)
-        self.scene.addPolygon(polygon, pen, brush)
-        # Update view to include new polygon
-        self._update_view()
-
-    def draw_text(self, x, y, text, color, font_name, font_size, align):
-        """Draw text."""
-        text_item = self.scene.addText(text)
-        # Update view to include new text
-        self._update_view()
-        text_item.setDefaultTextColor(QColor(color))
-        font = QFont(font_name, font_size)
-        text_item.setFont(font)
-        # Flip text back (since view is flipped)
-        text_item.setTransform(QTransform().scale(1, -1))
-        text_item.setPos(x, y)
-
-    def update_turtle(self, turtle_id, x, y, heading, visible, color):
-        """Update turtle position and draw cursor if visible."""
-        self.turtles[turtle_id] = (x, y, heading, visible, color)
-        if turtle_id in self._turtle_cursors:
-            self.scene.removeItem(self._turtle_cursors[turtle_id])
-            del self._turtle_cursors[turtle_id]
-        if visible:
-            self._turtle_cursors[turtle_id] = self._draw_turtle_cursor(x, y, heading, color)
-
-    def draw_stamp(self, x, y, heading, color):
-        """Draw a stamp (fixed triangle) at position."""
-        points = self._triangle_points(x, y, heading, size=12)
-        polygon = QPolygonF([QPointF(a, b) for a, b in points])
-        brush = QBrush(QColor(color))
-        pen = QPen(QColor("black"))
-        pen.setWidthF(0.5)
-        self.scene.addPolygon(polygon, pen, brush)
-        self._update_view()
-
-    def process_command(self, cmd):
-        """Process a turtle drawing command."""
-        cmd_type = cmd.get("type")
-
-        if cmd_type == "line":
-            self.draw_line(cmd["x1"], cmd["y1"], cmd["x2"], cmd["y2"],
-                          cmd["color"], cmd["width"])
-        elif cmd_type == "dot":
-            self.draw_dot(cmd["x"], cmd["y"], cmd["size"], cmd["color"])
-        elif cmd_type == "fill":
-            self.draw_fill(cmd["points"], cmd["color"])
-        elif cmd_type == "text":
-            self.draw_text(cmd["x"], cmd["y"], cmd["text"], cmd["color"],
-                          cmd["font"], cmd["size"], cmd["align"])
-        elif cmd_type == "bgcolor":
-            self.set_bgcolor(cmd["color"])
-        elif cmd_type == "clear" or cmd_type == "reset":
-            self.clear()
-        elif cmd_type == "turtle_update":
-            self.update_turtle(cmd["id"], cmd["x"], cmd["y"],
-                              cmd["heading"], cmd["visible"], cmd["pen_color"])
-        elif cmd_type == "stamp":
-            self.draw_stamp(cmd["x"], cmd["y"], cmd["heading"], cmd["color"])
-        elif cmd_type == "done":
-            pass  # Program finished
-
-
-class GraphicsPanel(QFrame):
-    """Right panel for graphics output (PyTurtle/Pygame)."""
 
-    def __init__(self):
+class WorkerPool(QObject):
+    """Python interpreters started ahead of time, waiting for code to run.
+
+    Each worker runs pide/runner.py, which imports the modules lessons commonly
+    use and then waits on stdin for the code. take() hands out a waiting worker
+    and starts its replacement shortly after, so Run does not wait for
+    interpreter startup. Workers are started with the binary turtle protocol
+    and their own graphics pipe, as a turtle program needs.
+    """
+
+    SIZE = 2
+    REFILL_DELAY_MS = 250  # Let the program that was just handed out start first
+    RUNNER_PATH = Path(__file__).parent / "runner.py"
+
+    def __init__(self, size=SIZE, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self._idle = []  # (process, graphics read fd or -1)
+
+    def take(self):
+        """Return (process, graphics read fd or -1) of a started worker.
+
+        The process object is deleted once the worker has finished.
+        """
+        entry = self._idle.pop(0) if self._idle else self._spawn()
+        entry[0].finished.connect(entry[0].deleteLater)
+        QTimer.singleShot(self.REFILL_DELAY_MS, self.fill)
+        return entry
+
+    def fill(self):
+        """Start workers until size are waiting."""
+        while len(self._idle) < self.size:
+            self._idle.append(self._spawn())
+
+    @staticmethod
+    def run(process, code):
+        """Send a worker the code to run."""
+        data = code.encode("utf-8")
+        process.write(b"%d\n" % len(data) + data)
+
+    def shutdown(self):
+        """Stop the waiting workers."""
+        idle, self._idle = self._idle, []
+        for process, read_fd in idle:
+            process.kill()
+            process.waitForFinished(1000)
+            if read_fd >= 0:
+                os.close(read_fd)
+
+    def _spawn(self):
+        process = QProcess(self)
+        env = QProcessEnvironment.systemEnvironment()
+        # Ask the backend for compact binary records instead of JSON
+        env.insert(turtle_protocol.PROTOCOL_ENV, "binary")
+        read_fd, write_fd = self._open_graphics_channel(env)
+        process.setProcessEnvironment(env)
+        process.finished.connect(lambda *_: self._discard(process))
+        # Run python with -u for unbuffered output
+        process.start(sys.executable, ["-u", str(self.RUNNER_PATH)])
+        if write_fd is not None:
+            # The child has its own copy now; closing ours lets the reader see EOF
+            os.close(write_fd)
+        return process, read_fd
+
+    def _discard(self, process):
+        """Forget a worker that exited while still waiting."""
+        for entry in self._idle:
+            if entry[0] is process:
+                self._idle.remove(entry)
+                if entry[1] >= 0:
+                    os.close(entry[1])
+                break
+
+    @staticmethod
+    def _open_graphics_channel(env):
+        """Create the pipe the turtle backend writes commands to.
+
+        Returns (read_fd, write_fd). The child inherits the write end through its
+        environment; the read end is handed to the OutputReader. Where fd
+        inheritance is unavailable returns (-1, None) and commands go to stdout.
+        """
+        if os.name != "posix":
+            return -1, None
+        read_fd, write_fd = os.pipe()
+        os.set_inheritable(write_fd, True)
+        os.set_blocking(read_fd, False)
+        env.insert(turtle_protocol.CHANNEL_ENV, str(write_fd))
+        return read_fd, write_fd
+
+
+class ForkedProcess(QObject):
+    """A program run by the ForkServer, behind the parts of QProcess MainWindow uses.
+
+    The IDE keeps the parent ends of the child's stdin, stdout and stderr pipes;
+    the server reports the child's pid and, later, its exit code.
+    """
+
+    readyReadStandardOutput = Signal()
+    readyReadStandardError = Signal()
+    finished = Signal(int, object)  # exit code, QProcess.ExitStatus
+
+    def __init__(self, server, stdin_fd, stdout_fd, stderr_fd):
         super().__init__()
-        self.setFrameStyle(QFrame.NoFrame)
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #21252B;
-                border: none;
-            }
-        """)
+        self.pid = None
+        self._server = server
+        self._exit_code = None
+        self._kill_requested = False
+        self._stdin_fd = stdin_fd
+        self._stdin_pending = bytearray()
+        self._stdin_notifier = QSocketNotifier(stdin_fd, QSocketNotifier.Write, self)
+        self._stdin_notifier.setEnabled(False)
+        self._stdin_notifier.activated.connect(self._write_pending)
+        self._buffers = {stdout_fd: bytearray(), stderr_fd: bytearray()}
+        self._signals = {
+            stdout_fd: self.readyReadStandardOutput,
+            stderr_fd: self.readyReadStandardError,
+        }
+        self._stdout_fd = stdout_fd
+        self._stderr_fd = stderr_fd
+        self._notifiers = {}
+        for fd in (stdout_fd, stderr_fd):
+            notifier = QSocketNotifier(fd, QSocketNotifier.Read, self)
+            notifier.activated.connect(lambda *_, fd=fd: self._read(fd))
+            self._notifiers[fd] = notifier
+
+    def state(self):
+        if self._exit_code is None:
+            return QProcess.Running
+        return QProcess.NotRunning
+
+    def readAllStandardOutput(self):
+        return self._take(self._stdout_fd)
+
+    def readAllStandardError(self):
+        return self._take(self._stderr_fd)
+
+    def write(self, data):
+        """Queue data for the child's stdin; it is written as the pipe drains."""
+        if self._stdin_fd < 0:
+            return
+        self._stdin_pending.extend(data)
+        self._write_pending()
 
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(0)
+    def processId(self):
+        return self.pid or 0
 
-        # Header
-        header = QLabel("Graphics Output")
-        header.setAlignment(Qt.AlignCenter)
-        header.setStyleSheet("""
-            QLabel {
-                color: #ABB2BF;
-                font-size: 12px;
-                padding: 6px;
-                background-color: #282C34;
-            }
-        """)
-        layout.addWidget(header)
+    def kill(self):
+        if self._exit_code is not None:
+            return
+        if self.pid is None:
+            self._kill_requested = True  # Killed once the server reports the pid
+            return
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def waitForFinished(self, msecs=30000):
+        return self._server.wait_for(self, msecs)
+
+    def _take(self, fd):
+        data = bytes(self._buffers[fd])
+        self._buffers[fd].clear()
+        return QByteArray(data)
+
+    def _write_pending(self):
+        try:
+            written = os.write(self._stdin_fd, self._stdin_pending)
+        except BlockingIOError:
+            written = 0
+        except OSError:
+            # The child closed its stdin or exited
+            self._stdin_pending.clear()
+            written = 0
+        del self._stdin_pending[:written]
+        self._stdin_notifier.setEnabled(bool(self._stdin_pending))
+
+    def _read(self, fd):
+        """Read what is available on fd; returns False once it reached EOF."""
+        if fd not in self._notifiers:
+            return False
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return True
+        if not data:
+            self._close_output(fd)
+            return False
+        self._buffers[fd].extend(data)
+        self._signals[fd].emit()
+        return True
 
-        # Turtle canvas
-        self.canvas = TurtleCanvas()
-        layout.addWidget(self.canvas)
+    def _close_output(self, fd):
+        self._notifiers.pop(fd).setEnabled(False)
+        os.close(fd)
 
-        self.setMinimumWidth(250)
+    def _started(self, pid):
+        self.pid = pid
+        if self._kill_requested:
+            self.kill()
+
+    def _exited(self, exit_code):
+        """Drain what the child wrote before it exited, then report it finished."""
+        if self._exit_code is not None:
+            return
+        for fd in list(self._notifiers):
+            # Only what is already there: a grandchild may keep the pipe open
+            while select.select([fd], [], [], 0)[0] and self._read(fd):
+                pass
+            if fd in self._notifiers:
+                self._close_output(fd)
+        self._stdin_notifier.setEnabled(False)
+        os.close(self._stdin_fd)
+        self._stdin_fd = -1
+        self._exit_code = exit_code
+        if exit_code < 0:
+            # Killed by signal -exit_code; QProcess reports the signal number
+            # with CrashExit, as a pool worker would
+            self.finished.emit(-exit_code, QProcess.CrashExit)
+        else:
+            self.finished.emit(exit_code, QProcess.NormalExit)
+
+
+class ForkServer(QObject):
+    """A preloaded interpreter on Linux that forks a fresh child for every run.
+
+    Forking from a warm interpreter is cheaper than starting one, even one
+    waiting in the WorkerPool: the child already has the common modules
+    imported and is ready as soon as fork() returns. The server is
+    pide/runner.py in --fork-server mode; requests go over a Unix socket pair
+    carrying the child's pipes as SCM_RIGHTS. Where fork() or fd passing is
+    unavailable, or PIDE_EXEC_MODE=pool, MainWindow uses the WorkerPool instead.
+    """
+
+    MODE_ENV = "PIDE_EXEC_MODE"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._starting = deque()  # Runs waiting for their pid, in request order
+        self._running = {}  # pid -> ForkedProcess
+        self._failed = False  # A request could not be sent; the server is being killed
+        self._sock, server_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        server_sock.set_inheritable(True)
+        self._process = QProcess(self)
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert(turtle_protocol.PROTOCOL_ENV, "binary")
+        self._process.setProcessEnvironment(env)
+        self._process.setProcessChannelMode(QProcess.ForwardedErrorChannel)
+        self._process.finished.connect(self._on_server_finished)
+        self._process.start(
+            sys.executable,
+            ["-u", str(WorkerPool.RUNNER_PATH), "--fork-server", str(server_sock.fileno())],
+        )
+        server_sock.close()
+        self._sock.setblocking(False)
+        self._notifier = QSocketNotifier(self._sock.fileno(), QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self._read_messages)
+
+    @classmethod
+    def supported(cls):
+        """Whether to run programs through a fork server on this system."""
+        return (
+            sys.platform.startswith("linux")
+            and hasattr(socket, "send_fds")
+            and os.environ.get(cls.MODE_ENV, "fork") == "fork"
+        )
+
+    def available(self):
+        return not self._failed and self._process.state() != QProcess.NotRunning
+
+    def start_run(self):
+        """Ask for a new child; returns (ForkedProcess, graphics read fd).
+
+        As with WorkerPool.take(), the child then waits for WorkerPool.run().
+        Returns None if the request cannot be sent, e.g. the server has just
+        died; the server is then no longer available.
+        """
+        stdin_r, stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        graphics_r, graphics_w = os.pipe()
+        child_fds = [stdin_r, stdout_w, stderr_w, graphics_w]
+        try:
+            socket.send_fds(self._sock, [b"run"], child_fds)
+        except OSError:
+            for fd in (stdin_w, stdout_r, stderr_r, graphics_r):
+                os.close(fd)
+            # Runs still waiting on it are ended when it has finished
+            self._failed = True
+            self._process.kill()
+            return None
+        finally:
+            # The server has its own copies now
+            for fd in child_fds:
+                os.close(fd)
+        for fd in (stdin_w, stdout_r, stderr_r, graphics_r):
+            os.set_blocking(fd, False)
+        process = ForkedProcess(self, stdin_w, stdout_r, stderr_r)
+        self._starting.append(process)
+        return process, graphics_r
+
+    def wait_for(self, process, msecs):
+        """Block until process has finished or msecs have passed."""
+        clock = QElapsedTimer()
+        clock.start()
+        while process.state() == QProcess.Running and self.available():
+            remaining = msecs - clock.elapsed()
+            if remaining <= 0:
+                return False
+            select.select([self._sock], [], [], remaining / 1000)
+            self._read_messages()
+        return process.state() == QProcess.NotRunning
+
+    def shutdown(self):
+        """Stop the server and the programs it is running; closing the socket ends its loop."""
+        for process in list(self._starting) + list(self._running.values()):
+            process.kill()
+        self._notifier.setEnabled(False)
+        self._sock.close()
+        if not self._process.waitForFinished(1000):
+            self._process.kill()
+            self._process.waitForFinished(1000)
+
+    def _read_messages(self):
+        while True:
+            try:
+                message = self._sock.recv(64)
+            except BlockingIOError:
+                return
+            except OSError:
+                message = b""
+            if not message:
+                self._notifier.setEnabled(False)
+                return
+            kind, *values = message.split()
+            if kind == b"started" and self._starting:
+                pid = int(values[0])
+                process = self._starting.popleft()
+                self._running[pid] = process
+                process._started(pid)
+            elif kind == b"exit":
+                process = self._running.pop(int(values[0]), None)
+                if process is not None:
+                    process._exited(int(values[1]))
+
+    def _on_server_finished(self, *_):
+        """The server died: runs it would report on can no longer finish normally."""
+        self._notifier.setEnabled(False)
+        for process in list(self._starting) + list(self._running.values()):
+            process.kill()
+            process._exited(-signal.SIGKILL)
+        self._starting.clear()
+        self._running.clear()
+
+
+class ProcessTerminator(QObject):
+    """Ends runs in the background, so stopping one never blocks the GUI.
+
+    A run first gets SIGTERM; if it is still alive after GRACE_MS, its whole
+    process group gets SIGKILL, which also ends any processes it started.
+    Programs run in their own process group (see pide/runner.py). The process
+    object is kept until it has been reaped.
+    """
+
+    GRACE_MS = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._dying = set()
+
+    def terminate(self, process):
+        if process.state() == QProcess.NotRunning or process in self._dying:
+            return
+        self._dying.add(process)
+        process.finished.connect(lambda *_: self._dying.discard(process))
+        if os.name != "posix":
+            process.terminate()
+        else:
+            self._signal(process, signal.SIGTERM)
+        QTimer.singleShot(self.GRACE_MS, lambda: self._kill(process))
+
+    def _kill(self, process):
+        if process not in self._dying:
+            return  # Already reaped
+        if os.name != "posix":
+            process.kill()
+        else:
+            self._signal(process, signal.SIGKILL)
+
+    @staticmethod
+    def _signal(process, signum):
+        pid = process.processId()
+        if not pid:
+            process.kill()  # Not started yet; killed as soon as it is
+            return
+        try:
+            os.killpg(pid, signum)
+        except (ProcessLookupError, PermissionError):
+            # Not (yet) leading a process group of its own
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
 
-    def clear(self):
-        """Clear the graphics panel."""
-        self.canvas.clear()
 
-    def process_command(self, cmd):
-        """Process a turtle drawing command."""
-        self.canvas.process_command(cmd)
+class StartupProfile:
+    """Per-phase startup timings, printed to stderr by ``pide --startup-profile``.
+
+    Phases are timed from the start of importing this module; mark(phase)
+    closes the phase that ends now.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = []
+        self._last = _IMPORT_STARTED
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last, now - _IMPORT_STARTED))
+        self._last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        lines = [f"{'phase':<20} {'ms':>8} {'total ms':>9}"]
+        for phase, seconds, total in self.phases:
+            lines.append(f"{phase:<20} {seconds * 1000:8.1f} {total * 1000:9.1f}")
+        print("\n".join(lines), file=sys.stderr)
+
+
+startup_profile = StartupProfile()
 
 
 class MainWindow(QMainWindow):
     """Main application window."""
 
+    # Requests to the OutputReader thread
+    _reader_start = Signal(int, int)
+    _reader_stdout = Signal(int, object)
+    _reader_stderr = Signal(int, object)
+    _reader_finish = Signal(int, int)
+    _reader_stop = Signal()
+    _reader_throttle = Signal(bool)
+    # Requests to the FileWriter thread
+    _writer_write = Signal(str, str)
+    _writer_sync = Signal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Pide - Python IDE")
@@ -774,13 +1850,90 @@ class MainWindow(QMainWindow):
         self.process = None
         self.current_file = None
         self._uses_turtle = False
-        self._stdout_buffer = ""
+        self._run_generation = 0  # output tagged with an older generation is stale
+        self.worker_pool = WorkerPool(parent=self)
+        self.terminator = ProcessTerminator(parent=self)
+        self.fork_server = None
+        self._setup_output_reader()
+        self._setup_file_writer()
         self._setup_ui()
+        startup_profile.mark("ui")
         self._setup_menu()
-        self._setup_shortcuts()
         self._setup_autosave()
+        self._setup_journal()
         self._update_title()
 
+        # Everything the editor can do without is set up once it has painted,
+        # one step per event loop turn (see _continue_startup)
+        self._startup_steps = deque([
+            ("journals", self._recover_buffers),
+            ("runners", self._start_runners),
+            ("file tree", self.file_tree.load),
+            ("graphics panel", self._setup_graphics_panel),
+            ("menus", self._setup_more_menus),
+            ("recovery", self._offer_recovery),
+        ])
+        self.editor.viewport().installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and watched is self.editor.viewport():
+            watched.removeEventFilter(self)
+            startup_profile.mark("first paint")
+            QTimer.singleShot(0, self._continue_startup)
+        return super().eventFilter(watched, event)
+
+    def _continue_startup(self):
+        """Run the next deferred startup step; reports the profile after the last."""
+        if not self._startup_steps:
+            return
+        name, step = self._startup_steps.popleft()
+        step()
+        startup_profile.mark(name)
+        if self._startup_steps:
+            QTimer.singleShot(0, self._continue_startup)
+        else:
+            startup_profile.report()
+
+    def _finish_startup(self):
+        """Run the deferred startup steps that are left, e.g. when Run comes first."""
+        while self._startup_steps:
+            self._continue_startup()
+
+    def _start_runners(self):
+        """Start the fork server, or pre-start workers where there is none."""
+        if ForkServer.supported():
+            self.fork_server = ForkServer(parent=self)
+        else:
+            self.worker_pool.fill()
+
+    def _setup_output_reader(self):
+        """Start the thread that parses program output."""
+        self._reader_thread = QThread(self)
+        self._reader = OutputReader()
+        self._reader.moveToThread(self._reader_thread)
+        self._reader_thread.finished.connect(self._reader.deleteLater)
+        self._reader_start.connect(self._reader.start)
+        self._reader_stdout.connect(self._reader.feed_stdout)
+        self._reader_stderr.connect(self._reader.feed_stderr)
+        self._reader_finish.connect(self._reader.finish)
+        self._reader_stop.connect(self._reader.stop)
+        self._reader_throttle.connect(self._reader.throttle)
+        self._reader.batch_ready.connect(self._on_output_batch)
+        self._reader.run_finished.connect(self._on_run_finished)
+        self._reader_thread.start()
+
+    def _setup_file_writer(self):
+        """Start the thread that saves files."""
+        self._writer_thread = QThread(self)
+        self._writer = FileWriter()
+        self._writer.moveToThread(self._writer_thread)
+        self._writer_thread.finished.connect(self._writer.deleteLater)
+        self._writer_write.connect(self._writer.write)
+        self._writer_sync.connect(self._writer.sync, Qt.BlockingQueuedConnection)
+        self._writer.saved.connect(self._on_file_saved)
+        self._writer.failed.connect(self._on_save_failed)
+        self._writer_thread.start()
+
     def _setup_ui(self):
         # Main horizontal splitter
         main_splitter = QSplitter(Qt.Horizontal)
@@ -851,6 +2004,7 @@ class MainWindow(QMainWindow):
         editor_terminal_splitter = QSplitter(Qt.Vertical)
         self.editor = Editor(self.editor_font_size)
         self.terminal = Terminal(self.terminal_font_size)
+        self.terminal.line_activated.connect(self.editor.go_to_line)
         editor_terminal_splitter.addWidget(self.editor)
         editor_terminal_splitter.addWidget(self.terminal)
         editor_terminal_splitter.setSizes([400, 200])
@@ -858,14 +2012,24 @@ class MainWindow(QMainWindow):
 
         main_splitter.addWidget(center_widget)
 
-        # Right: Graphics panel
-        self.graphics_panel = GraphicsPanel()
-        main_splitter.addWidget(self.graphics_panel)
+        # Right: Graphics panel, created by _setup_graphics_panel() once the
+        # window is up; an empty widget holds its place until then
+        self.graphics_panel = None
+        main_splitter.addWidget(QWidget())
 
         # Set initial sizes
         main_splitter.setSizes([180, 600, 250])
 
         self.setCentralWidget(main_splitter)
+        self._main_splitter = main_splitter
+
+    def _setup_graphics_panel(self):
+        # Imported here, as a deferred startup step, to keep it out of the first paint
+        from pide.graphics import GraphicsPanel
+
+        self.graphics_panel = GraphicsPanel()
+        self.graphics_panel.backlog_changed.connect(self._reader_throttle)
+        self._main_splitter.replaceWidget(2, self.graphics_panel).deleteLater()
 
     def _setup_menu(self):
         menubar = self.menuBar()
@@ -902,8 +2066,39 @@ class MainWindow(QMainWindow):
         quit_action.triggered.connect(self.close)
         file_menu.addAction(quit_action)
 
+        # Run menu
+        run_menu = menubar.addMenu("Run")
+        self._run_menu = run_menu
+
+        run_action = QAction("Run", self)
+        run_action.setShortcut(QKeySequence("Ctrl+R"))
+        run_action.triggered.connect(self.run_code)
+        run_menu.addAction(run_action)
+
+        stop_action = QAction("Stop", self)
+        stop_action.setShortcut(QKeySequence("Ctrl+."))
+        stop_action.triggered.connect(self.stop_code)
+        run_menu.addAction(stop_action)
+
+        run_menu.addSeparator()
+
+        clear_output_action = QAction("Clear Output", self)
+        clear_output_action.setShortcut(QKeySequence("Ctrl+K"))
+        clear_output_action.triggered.connect(self.terminal.clear)
+        run_menu.addAction(clear_output_action)
+
+    def _setup_more_menus(self):
+        """Add the Edit, View and Help menus and the zoom shortcuts.
+
+        The editor handles the Edit shortcuts itself meanwhile, so these can
+        wait until the window is up.
+        """
+        menubar = self.menuBar()
+        before = self._run_menu.menuAction()
+
         # Edit menu
-        edit_menu = menubar.addMenu("Edit")
+        edit_menu = QMenu("Edit", self)
+        menubar.insertMenu(before, edit_menu)
 
         undo_action = QAction("Undo", self)
         undo_action.setShortcut(QKeySequence.Undo)
@@ -944,7 +2139,8 @@ class MainWindow(QMainWindow):
         edit_menu.addAction(select_all_action)
 
         # View menu
-        view_menu = menubar.addMenu("View")
+        view_menu = QMenu("View", self)
+        menubar.insertMenu(before, view_menu)
 
         zoom_in_action = QAction("Zoom In", self)
         zoom_in_action.setShortcut(QKeySequence("Ctrl+="))  # Ctrl+= or Ctrl+Plus
@@ -961,32 +2157,14 @@ class MainWindow(QMainWindow):
         zoom_reset_action.triggered.connect(self.zoom_reset)
         view_menu.addAction(zoom_reset_action)
 
-        # Run menu
-        run_menu = menubar.addMenu("Run")
-
-        run_action = QAction("Run", self)
-        run_action.setShortcut(QKeySequence("Ctrl+R"))
-        run_action.triggered.connect(self.run_code)
-        run_menu.addAction(run_action)
-
-        stop_action = QAction("Stop", self)
-        stop_action.setShortcut(QKeySequence("Ctrl+."))
-        stop_action.triggered.connect(self.stop_code)
-        run_menu.addAction(stop_action)
-
-        run_menu.addSeparator()
-
-        clear_output_action = QAction("Clear Output", self)
-        clear_output_action.setShortcut(QKeySequence("Ctrl+K"))
-        clear_output_action.triggered.connect(self.terminal.clear)
-        run_menu.addAction(clear_output_action)
-
         # Help menu
         help_menu = menubar.addMenu("Help")
 
         about_action = QAction("About Pide", self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
+
+        self._setup_shortcuts()
     
     def _setup_shortcuts(self):
         """Setup global keyboard shortcuts for zoom."""
@@ -1038,76 +2216,89 @@ class MainWindow(QMainWindow):
         """Open file from tree view."""
         # Save current file if modified before switching
         self._save_current_if_modified()
+        self._wait_for_writes()
         
         # Open the new file
         with open(path, "r", encoding="utf-8") as f:
-            self.editor.setPlainText(f.read())
-        self.current_file = path
-        self.editor.document().setModified(False)
+            self._load_buffer(path, f.read())
         self._update_title()
         # Highlight the opened file in tree
         self.file_tree.highlight_file(path)
 
     def run_code(self):
         """Run the current code in the editor."""
+        self._finish_startup()
         self.terminal.clear()
         self.graphics_panel.clear()
-        self._stdout_buffer = ""
         self.terminal.appendPlainText(">>> Running...\n")
 
         code = self.editor.toPlainText()
 
-        # Kill previous process if running
+        # Stop the previous run in the background; this one starts right away
         if self.process is not None:
-            self.process.kill()
-            self.process.waitForFinished()
-
-        self.process = QProcess(self)
+            self._end_process()
+
+        self._run_generation += 1
+        generation = self._run_generation
+        started = None
+        if self.fork_server is not None and self.fork_server.available():
+            started = self.fork_server.start_run()
+        if started is None:
+            # No fork server here, or it died: fall back to spawned workers
+            started = self.worker_pool.take()
+        self.process, read_fd = started
         self.process.readyReadStandardOutput.connect(self._on_stdout)
         self.process.readyReadStandardError.connect(self._on_stderr)
-        self.process.finished.connect(self._on_finished)
+        self.process.finished.connect(
+            lambda exit_code, exit_status: self._on_finished(generation, exit_code, exit_status)
+        )
 
         # Connect terminal to process for input
         self.terminal.set_process(self.process)
+        self._reader_start.emit(generation, read_fd)
 
         # Check if code uses turtle
         self._uses_turtle = "import turtle" in code or "from turtle import" in code
-
         if self._uses_turtle:
             # Inject our turtle backend
             turtle_backend_path = Path(__file__).parent / "turtle_backend.py"
             # Replace turtle import with our backend
-            modified_code = code.replace("import turtle", f'import sys; sys.path.insert(0, "{turtle_backend_path.parent}"); import turtle_backend as turtle')
-            modified_code = modified_code.replace("from turtle import", f'import sys; sys.path.insert(0, "{turtle_backend_path.parent}"); from turtle_backend import')
-            self.process.start(sys.executable, ["-u", "-c", modified_code])
-        else:
-            # Run python with -u for unbuffered output
-            self.process.start(sys.executable, ["-u", "-c", code])
+            code = code.replace("import turtle", f'import sys; sys.path.insert(0, "{turtle_backend_path.parent}"); import turtle_backend as turtle')
+            code = code.replace("from turtle import", f'import sys; sys.path.insert(0, "{turtle_backend_path.parent}"); from turtle_backend import')
+        self.worker_pool.run(self.process, code)
+
+    def _end_process(self):
+        """Detach from the current run and have it terminated in the background."""
+        self.process.readyReadStandardOutput.disconnect(self._on_stdout)
+        self.process.readyReadStandardError.disconnect(self._on_stderr)
+        self.terminator.terminate(self.process)
 
     def _on_stdout(self):
-        data = self.process.readAllStandardOutput().data().decode()
-        self._stdout_buffer += data
-        lines = self._stdout_buffer.split("\n")
-        self._stdout_buffer = lines.pop() if lines else ""
-        for line in lines:
-            if line.startswith("__PIDE_TURTLE__:"):
-                try:
-                    cmd_json = line[len("__PIDE_TURTLE__:"):]
-                    cmd = json.loads(cmd_json)
-                    self.graphics_panel.process_command(cmd)
-                except (json.JSONDecodeError, KeyError):
-                    pass
-            elif line.strip():
-                self.terminal.appendPlainText(line)
+        self._reader_stdout.emit(self._run_generation, self.process.readAllStandardOutput().data())
 
     def _on_stderr(self):
-        data = self.process.readAllStandardError().data().decode()
-        self.terminal.appendPlainText(f"[ERROR] {data.rstrip()}")
+        self._reader_stderr.emit(self._run_generation, self.process.readAllStandardError().data())
 
-    def _on_finished(self, exit_code, exit_status):
-        if self._stdout_buffer.strip():
-            self.terminal.appendPlainText(self._stdout_buffer.rstrip())
-            self._stdout_buffer = ""
+    def _on_finished(self, generation, exit_code, exit_status):
+        if generation == self._run_generation:
+            # A worker's process object is deleted once it has finished
+            self.process = None
+            self.terminal.set_process(None)
+        # The reader drains remaining output first, then reports via _on_run_finished
+        self._reader_finish.emit(generation, exit_code)
+
+    def _on_output_batch(self, generation, text, cmds):
+        """Show a batch of parsed output from the reader thread."""
+        if generation != self._run_generation:
+            return
+        if text:
+            self.terminal.write_output(text)
+        if cmds:
+            self.graphics_panel.enqueue(cmds)
+
+    def _on_run_finished(self, generation, exit_code):
+        if generation != self._run_generation:
+            return
         self.terminal.appendPlainText(f"\n>>> Process finished (exit code: {exit_code})")
         self.terminal.set_process(None)
 
@@ -1118,14 +2309,137 @@ class MainWindow(QMainWindow):
             name = "untitled.py"
         self.setWindowTitle(f"Pide - {name}")
 
+    AUTOSAVE_IDLE_MS = 1000  # Save once typing has paused this long
+    AUTOSAVE_MAX_MS = 10000  # ...or at the latest this long after the first change
+
     def _setup_autosave(self):
-        """Setup auto-save timer (save every 3 seconds if file exists)."""
+        """Setup auto-save: shortly after typing pauses, if the file exists."""
         self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(self.AUTOSAVE_IDLE_MS)
         self.autosave_timer.timeout.connect(self._autosave)
-        self.autosave_timer.start(3000)  # 3 seconds
+        self._autosave_deadline = QTimer(self)
+        self._autosave_deadline.setSingleShot(True)
+        self._autosave_deadline.setInterval(self.AUTOSAVE_MAX_MS)
+        self._autosave_deadline.timeout.connect(self._autosave)
+        self.editor.document().contentsChanged.connect(self._schedule_autosave)
         
         # Connect editor modification signal to track changes
         self.editor.document().modificationChanged.connect(self._on_editor_modified)
+
+    def _setup_journal(self):
+        """Journal every edit of the buffer, so a crash loses nothing.
+
+        Journaling begins in _recover_buffers(), once the journals a crash left
+        behind have been read.
+        """
+        self.journal = EditJournal()
+        self._recovery = None  # [(path or None, text, journal mtime)] to offer; None until read
+        self._restored = {}  # path (None: untitled) -> restored text not shown yet
+        document = self.editor.document()
+        document.contentsChange.connect(
+            lambda position, removed, added: self.journal.record(document, position, removed, added)
+        )
+
+    def _load_buffer(self, path, text, modified=False):
+        """Show text in the editor as the buffer for path (None: untitled).
+
+        modified marks the text as unsaved changes, e.g. restored after a
+        crash; they are journaled again right away. Changes restored for path
+        that have not been shown yet replace text.
+        """
+        if path in self._restored:
+            text, modified = self._restored.pop(path), True
+        if self.current_file is None:
+            # Untitled text is dropped when another buffer replaces it
+            self.journal.discard(None)
+        self.journal.end()
+        self.editor.setPlainText(text)
+        self.current_file = path
+        self.editor.document().setModified(modified)
+        self.journal.begin(path)
+        if modified:
+            self.journal.snapshot(self.editor.document())
+
+    def _recover_buffers(self):
+        """Find edits that journals left behind hold but files do not.
+
+        A journal only counts if it is newer than its file: a file changed
+        since (in another editor, by git...) or deleted since is left as it
+        is and the journal dropped. Nothing is restored before
+        _offer_recovery() has asked. The current buffer is journaled from
+        here on.
+        """
+        self._recovery = []
+        for path, text, mtime in self.journal.recover():
+            if path is not None:
+                try:
+                    newer = mtime > os.stat(path).st_mtime
+                except OSError:
+                    newer = False
+                if newer:
+                    try:
+                        with open(path, encoding="utf-8") as f:
+                            newer = f.read() != text
+                    except (OSError, ValueError):
+                        pass
+                if not newer:
+                    self.journal.discard(path)
+                    continue
+            self._recovery.append((path, text, mtime))
+        self.journal.begin(self.current_file)
+
+    def _offer_recovery(self):
+        """Ask whether to restore the changes _recover_buffers() found.
+
+        The question is window modal but does not block, so startup carries on
+        while it is open; _restore_buffers() acts on the answer.
+        """
+        recovery, self._recovery = self._recovery, []
+        if not recovery:
+            return
+        recovery.sort(key=lambda buffer: buffer[2])
+        names = ["untitled" if path is None else Path(path).name for path, _, _ in recovery]
+        box = QMessageBox(
+            QMessageBox.Question,
+            "Recover Unsaved Changes",
+            "Pide did not close properly. There are unsaved changes to:\n\n"
+            + "\n".join(names)
+            + "\n\nRestore them? Restored changes are saved like any other edit;"
+            " otherwise they are discarded.",
+            QMessageBox.Yes | QMessageBox.No,
+            self,
+        )
+        box.setDefaultButton(QMessageBox.Yes)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.finished.connect(lambda _: self._restore_buffers(
+            recovery, names, box.standardButton(box.clickedButton()) == QMessageBox.Yes))
+        box.open()
+
+    def _restore_buffers(self, recovery, names, restore):
+        """Restore the recovered changes, or discard them.
+
+        The editor shows the untitled buffer if there was one, as it exists
+        nowhere else, otherwise the most recently edited file; other files get
+        their changes back when they are opened. Nothing is written to disk
+        here.
+        """
+        if not restore:
+            for path, _, _ in recovery:
+                self.journal.discard(path)
+            return
+        self._restored = {path: text for path, text, _ in recovery}
+        shown = None if None in self._restored else recovery[-1][0]
+        self._save_current_if_modified()
+        self._load_buffer(shown, self._restored[shown])
+        self._update_title()
+        self.file_tree.highlight_file(shown)
+        self.terminal.appendPlainText(f">>> Recovered unsaved changes: {', '.join(names)}\n")
+
+    def _schedule_autosave(self):
+        self.autosave_timer.start()
+        if not self._autosave_deadline.isActive():
+            self._autosave_deadline.start()
     
     def _on_editor_modified(self, modified):
         """Handle editor modification status change."""
@@ -1138,26 +2452,41 @@ class MainWindow(QMainWindow):
             self.setWindowTitle(f"Pide - {name}")
     
     def _save_current_if_modified(self):
-        """Save current file if it exists and has been modified."""
+        """Save current file if it exists and has been modified.
+
+        Only the text is taken here; the FileWriter thread writes it.
+        """
         if self.current_file and self.editor.document().isModified():
-            try:
-                with open(self.current_file, "w", encoding="utf-8") as f:
-                    f.write(self.editor.toPlainText())
-                self.editor.document().setModified(False)
-                # Refresh file tree after save
-                if hasattr(self.file_tree, 'tree'):
-                    self.file_tree.tree.setRootIndex(
-                        self.file_tree.model.index(str(PIDE_HOME))
-                    )
-                return True
-            except Exception as e:
-                # Silently fail for auto-save
-                return False
-        return True
+            self._save_to(self.current_file)
+
+    def _save_to(self, path):
+        """Hand the editor's text to the FileWriter thread for path."""
+        self._writer_write.emit(path, self.editor.toPlainText())
+        # Set back to modified by _on_save_failed if the write fails
+        self.editor.document().setModified(False)
+
+    def _wait_for_writes(self):
+        """Block until the FileWriter has finished the saves asked for so far."""
+        self._writer_sync.emit()
+
+    def _on_file_saved(self, path):
+        self.file_tree.refresh_file(path)
+        # The file now holds the journaled edits, unless there were more since
+        if path != self.current_file or not self.editor.document().isModified():
+            self.journal.discard(path)
+
+    def _on_save_failed(self, path, message):
+        # Autosave fails silently; keep the text marked unsaved so it is retried
+        if path == self.current_file:
+            self.editor.document().setModified(True)
     
     def _autosave(self):
         """Auto-save current file if it exists and has been modified."""
+        self.autosave_timer.stop()
+        self._autosave_deadline.stop()
         self._save_current_if_modified()
+        self.journal.flush()
+        self.journal.compact(self.editor.document())
     
     def new_file(self):
         """Create a new Python file in the same directory as current or selected file."""
@@ -1195,17 +2524,9 @@ class MainWindow(QMainWindow):
         filepath.write_text(default_content, encoding="utf-8")
         
         # Open the new file
-        self.editor.setPlainText(default_content)
-        self.current_file = str(filepath)
-        self.editor.document().setModified(False)
+        self._load_buffer(str(filepath), default_content)
         self._update_title()
         
-        # Refresh file tree first, then highlight
-        if hasattr(self.file_tree, 'tree'):
-            self.file_tree.tree.setRootIndex(
-                self.file_tree.model.index(str(PIDE_HOME))
-            )
-        
         # Highlight the new file in tree (this will also expand and scroll)
         self.file_tree.highlight_file(str(filepath))
 
@@ -1217,24 +2538,16 @@ class MainWindow(QMainWindow):
             self, "Open File", str(PIDE_HOME), "Python Files (*.py);;All Files (*)"
         )
         if path:
+            self._wait_for_writes()
             with open(path, "r", encoding="utf-8") as f:
-                self.editor.setPlainText(f.read())
-            self.current_file = path
-            self.editor.document().setModified(False)
+                self._load_buffer(path, f.read())
             self._update_title()
             # Highlight the opened file in tree
             self.file_tree.highlight_file(path)
 
     def save_file(self):
         if self.current_file:
-            with open(self.current_file, "w", encoding="utf-8") as f:
-                f.write(self.editor.toPlainText())
-            self.editor.document().setModified(False)
-            # Refresh file tree
-            if hasattr(self.file_tree, 'tree'):
-                self.file_tree.tree.setRootIndex(
-                    self.file_tree.model.index(str(PIDE_HOME))
-                )
+            self._save_to(self.current_file)
         else:
             self.save_file_as()
 
@@ -1255,27 +2568,59 @@ class MainWindow(QMainWindow):
             "Python Files (*.py);;All Files (*)"
         )
         if path:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(self.editor.toPlainText())
             self.current_file = path
-            self.editor.document().setModified(False)
+            self.journal.rename(path, self.editor.document())
+            self._save_to(path)
             self._update_title()
+            # The tree only shows the file once it exists
+            self._wait_for_writes()
             # Highlight the saved file in tree
             self.file_tree.highlight_file(path)
-            # Refresh file tree
-            if hasattr(self.file_tree, 'tree'):
-                self.file_tree.tree.setRootIndex(
-                    self.file_tree.model.index(str(PIDE_HOME))
-                )
 
     def stop_code(self):
         if self.process and self.process.state() == QProcess.Running:
-            self.process.kill()
+            self._end_process()
+            self.process = None
+            # Drop anything still in flight from this run
+            self._run_generation += 1
+            self._reader_stop.emit()
             self.graphics_panel.clear()
-            self._stdout_buffer = ""
             self.terminal.appendPlainText("\n>>> Process stopped")
             self.terminal.set_process(None)
 
+    def closeEvent(self, event):
+        """Save, then stop the writer and reader threads, fork server and waiting workers."""
+        if (self.current_file is None and self.editor.document().isModified()
+                and self.editor.toPlainText().strip()):
+            answer = QMessageBox.question(
+                self,
+                "Save Changes",
+                "Save the untitled file before closing?",
+                QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel,
+                QMessageBox.Save,
+            )
+            if answer == QMessageBox.Save:
+                self.save_file_as()  # current_file stays None if cancelled there
+            if answer == QMessageBox.Cancel or (answer == QMessageBox.Save and self.current_file is None):
+                event.ignore()
+                return
+        self._startup_steps.clear()
+        self._save_current_if_modified()
+        self._wait_for_writes()
+        self.journal.end()
+        if self.current_file is None and self._recovery is not None:
+            # Saved or declined above; either way it is not to be recovered.
+            # (Unless the journals were never read: then it is from a crash.)
+            self.journal.discard(None)
+        self._writer_thread.quit()
+        self._writer_thread.wait()
+        if self.fork_server is not None:
+            self.fork_server.shutdown()
+        self.worker_pool.shutdown()
+        self._reader_thread.quit()
+        self._reader_thread.wait()
+        super().closeEvent(event)
+
     def show_about(self):
         QMessageBox.about(
             self,
@@ -1287,10 +2632,18 @@ class MainWindow(QMainWindow):
 
 
 def main():
-    app = QApplication(sys.argv)
+    argv = list(sys.argv)
+    if "--startup-profile" in argv:
+        # Print how long each startup phase took, once the window is ready
+        argv.remove("--startup-profile")
+        startup_profile.enabled = True
+        startup_profile.mark("import")
+    app = QApplication(argv)
     app.setStyle("Fusion")
+    startup_profile.mark("QApplication")
     window = MainWindow()
     window.show()
+    startup_profile.mark("show")
     sys.exit(app.exec())
 
 
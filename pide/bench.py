@@ -0,0 +1,375 @@
+"""
+Pide Benchmarks - Headless micro-benchmarks for the IDE's hot paths.
+
+Run with ``python -m pide.bench <benchmark>``; each benchmark prints one JSON
+object with its measurements so results can be compared between changes.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Sample sources: the lessons and demos shipped in the repository
+CODE_DIR = Path(__file__).parent.parent / "code"
+
+
+def _app():
+    """Return a QApplication, creating an offscreen one if needed."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
+
+
+def _sample_lines(count):
+    """Return count lines of Python, repeating the shipped sample code."""
+    lines = []
+    for path in sorted(CODE_DIR.rglob("*.py")):
+        lines.extend(path.read_text(encoding="utf-8").splitlines())
+    if not lines:
+        lines = ['print("Hello, World!")']
+    return (lines * (count // len(lines) + 1))[:count]
+
+
+def bench_highlight(args):
+    """Time highlighting a whole document with PythonSyntaxHighlighter."""
+    _app()
+    from PySide6.QtGui import QTextDocument
+    from pide.app import PythonSyntaxHighlighter
+
+    doc = QTextDocument()
+    doc.setPlainText("\n".join(_sample_lines(args.lines)))
+    highlighter = PythonSyntaxHighlighter(doc)  # highlights once on attach
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        highlighter.rehighlight()
+        times.append(time.perf_counter() - start)
+    best = min(times)
+    return {
+        "benchmark": "highlight",
+        "lines": doc.blockCount(),
+        "seconds": round(best, 4),
+        "lines_per_sec": round(doc.blockCount() / best) if best else None,
+    }
+
+
+def bench_open(args):
+    """Time loading a large file into the Editor, lazily and eagerly highlighted."""
+    app = _app()
+    from PySide6.QtCore import QTimer
+    from pide.app import Editor
+
+    text = "\n".join(_sample_lines(args.lines))
+    result = {"benchmark": "open", "lines": args.lines, "chars": len(text)}
+    for mode, threshold in (("lazy", 0), ("eager", len(text))):
+        editor = Editor(lazy_highlight_threshold=threshold)
+        editor.resize(800, 600)
+        editor.show()
+        start = time.perf_counter()
+        editor.setPlainText(text)
+        shown = time.perf_counter() - start
+        # Let idle-time highlighting run to completion
+        timer = QTimer()
+        timer.timeout.connect(lambda: editor.highlighter.lazy or app.quit())
+        timer.start(1)
+        app.exec()
+        timer.stop()
+        result[f"{mode}_seconds"] = round(shown, 4)
+        result[f"{mode}_complete_seconds"] = round(time.perf_counter() - start, 4)
+        editor.close()
+    return result
+
+
+def _first_output(start):
+    """Run start() -> process; return seconds until its first stdout, once it exits."""
+    from PySide6.QtCore import QEventLoop, QProcess, QTimer
+
+    loop = QEventLoop()
+    begin = time.perf_counter()
+    process = start()
+    first = []
+    process.readyReadStandardOutput.connect(
+        lambda: first or first.append(time.perf_counter() - begin))
+    process.finished.connect(loop.quit)
+    QTimer.singleShot(10000, loop.quit)
+    if process.state() != QProcess.NotRunning:
+        loop.exec()
+    return first[0] if first else None
+
+
+def _settle(seconds):
+    """Run the event loop for a while, e.g. so pre-started workers are ready."""
+    from PySide6.QtCore import QEventLoop, QTimer
+
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def bench_startup(args):
+    """Time from Run to a program's first output, per way of starting it."""
+    _app()
+    from PySide6.QtCore import QProcess
+    from pide.app import ForkServer, WorkerPool
+
+    code = Path(args.file).read_text(encoding="utf-8")
+
+    def spawn():
+        # A fresh interpreter per run
+        process = QProcess()
+        process.start(sys.executable, ["-u", "-c", code])
+        return process
+
+    def pool_run():
+        process, read_fd = pool.take()
+        if read_fd >= 0:
+            os.close(read_fd)
+        WorkerPool.run(process, code)
+        return process
+
+    def fork_run():
+        process, read_fd = server.start_run()
+        os.close(read_fd)
+        WorkerPool.run(process, code)
+        return process
+
+    pool = WorkerPool(size=1)
+    modes = [("spawn", spawn), ("pool", pool_run)]
+    server = None
+    if ForkServer.supported():
+        server = ForkServer()
+        modes.append(("fork", fork_run))
+    result = {"benchmark": "startup", "file": str(args.file), "runs": args.runs}
+    for mode, start in modes:
+        times = []
+        for _ in range(args.runs):
+            # Measure warm: the pool refilled, the fork server started
+            pool.fill()
+            _settle(args.settle)
+            times.append(_first_output(start))
+        times = sorted(t for t in times if t is not None)
+        result[f"{mode}_ms"] = round(times[len(times) // 2] * 1000, 1) if times else None
+    pool.shutdown()
+    if server is not None:
+        server.shutdown()
+    return result
+
+
+def _wait_until(condition, timeout=30.0):
+    """Run the event loop until condition() holds or timeout seconds pass."""
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        _settle(0.01)
+
+
+def bench_tree(args):
+    """Time the file tree's update after a save, for trees of growing size."""
+    app = _app()
+    import tempfile
+    from pide.app import FileTree
+
+    def reroot(tree, path):
+        # What every save used to do
+        tree.tree.setRootIndex(tree.model.index(str(tree_root)))
+
+    result = {"benchmark": "tree", "saves": args.saves}
+    for files in args.files:
+        with tempfile.TemporaryDirectory() as tmp:
+            tree_root = Path(tmp) / "code"
+            folders = [tree_root / f"lesson_{n:03d}" for n in range(max(files // 100, 1))]
+            for n in range(files):
+                folder = folders[n % len(folders)]
+                folder.mkdir(parents=True, exist_ok=True)
+                (folder / f"script_{n:05d}.py").write_text(f"print({n})\n", encoding="utf-8")
+            tree = FileTree(root=tree_root)
+            tree.load()
+            tree.setMaximumWidth(16777215)
+            tree.resize(300, 800)
+            tree.show()
+            # Let the model load every folder, then show them all expanded
+            model = tree.model
+            _wait_until(lambda: model.rowCount(model.index(str(tree_root))) == len(folders))
+            for folder in folders:
+                model.fetchMore(model.index(str(folder)))
+            _wait_until(lambda: sum(model.rowCount(model.index(str(f))) for f in folders) == files)
+            tree.tree.expandAll()
+            app.processEvents()
+            saved = folders[0] / "script_00000.py"
+            for mode, update in (("reroot", reroot), ("refresh", FileTree.refresh_file)):
+                times = []
+                for _ in range(args.saves):
+                    start = time.perf_counter()
+                    update(tree, str(saved))
+                    app.processEvents()  # Layout and repaint
+                    times.append(time.perf_counter() - start)
+                result[f"{mode}_ms_{files}"] = round(sorted(times)[len(times) // 2] * 1000, 3)
+            tree.close()
+            tree.deleteLater()
+            app.processEvents()
+    return result
+
+
+def _turtle_scripts():
+    """The shipped turtle examples, and the lessons that use turtle."""
+    scripts = sorted((CODE_DIR / "turtle").glob("*.py"))
+    for path in sorted((CODE_DIR / "learn").glob("*.py")):
+        code = path.read_text(encoding="utf-8")
+        if "import turtle" in code or "from turtle import" in code:
+            scripts.append(path)
+    return scripts
+
+
+def _emit_script(code):
+    """Run a turtle program in-process against a fresh backend.
+
+    Returns (graphics stream, seconds, error or None). The backend writes binary
+    records as it does to the IDE's graphics pipe; time.sleep() is a no-op
+    meanwhile, so only the program's own work is timed.
+    """
+    import atexit
+    import contextlib
+    import importlib
+    import io
+    import random
+    from pide import turtle_protocol
+
+    os.environ[turtle_protocol.PROTOCOL_ENV] = "binary"
+    os.environ.pop(turtle_protocol.CHANNEL_ENV, None)
+    sys.modules.pop("pide.turtle_backend", None)
+    backend = importlib.import_module("pide.turtle_backend")
+    atexit.unregister(backend._flush)
+    backend._channel = channel = io.BytesIO()
+    saved_turtle, saved_sleep = sys.modules.get("turtle"), time.sleep
+    sys.modules["turtle"] = backend
+    time.sleep = lambda seconds: None
+    random.seed(0)
+    error = None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            exec(compile(code, "<string>", "exec"), {"__name__": "__main__"})
+    except BaseException as exc:  # The program's own error, e.g. an unsupported call
+        error = f"{type(exc).__name__}: {exc}"
+    finally:
+        backend._flush()  # What atexit would do
+        seconds = time.perf_counter() - start
+        time.sleep = saved_sleep
+        if saved_turtle is None:
+            sys.modules.pop("turtle", None)
+        else:
+            sys.modules["turtle"] = saved_turtle
+    return channel.getvalue(), seconds, error
+
+
+def bench_turtle(args):
+    """Time the turtle pipeline per script: emit, parse and render its drawing."""
+    app = _app()
+    from pide import turtle_protocol
+    from pide.graphics import TurtleCanvas
+
+    chunk = 1 << 16  # What OutputReader reads from the graphics pipe at a time
+    phases = ("emit", "parse", "render", "paint")
+    result = {"benchmark": "turtle", "repeat": args.repeat, "scripts": {}}
+    totals = dict.fromkeys(("commands", "bytes", "items"), 0)
+    totals.update((f"{phase}_ms", 0.0) for phase in phases)
+    for path in _turtle_scripts():
+        code = path.read_text(encoding="utf-8")
+        best = {}
+        for _ in range(args.repeat):
+            times = {}
+            data, times["emit"], error = _emit_script(code)
+
+            start = time.perf_counter()
+            decoder = turtle_protocol.Decoder()
+            cmds = []
+            for pos in range(0, len(data), chunk):
+                cmds.extend(decoder.feed(data[pos:pos + chunk]))
+            times["parse"] = time.perf_counter() - start
+
+            canvas = TurtleCanvas()
+            canvas.resize(600, 600)
+            canvas.show()
+            app.processEvents()
+            start = time.perf_counter()
+            for cmd in cmds:
+                if cmd["type"] == "arc":
+                    cmd["duration"] = 0  # Draw arcs whole, as skipping playback does
+                canvas.process_command(cmd)
+            times["render"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            canvas._fit_view()
+            canvas.grab()
+            times["paint"] = time.perf_counter() - start
+
+            items = len(canvas.scene.items())
+            canvas.close()
+            canvas.deleteLater()
+            app.processEvents()
+            for phase, seconds in times.items():
+                best[phase] = min(best.get(phase, seconds), seconds)
+
+        entry = {"commands": len(cmds), "bytes": len(data), "items": items}
+        entry.update((f"{phase}_ms", round(best[phase] * 1000, 2)) for phase in phases)
+        if error:
+            entry["error"] = error
+        result["scripts"][str(path.relative_to(CODE_DIR))] = entry
+        for key in ("commands", "bytes", "items"):
+            totals[key] += entry[key]
+        for phase in phases:
+            totals[f"{phase}_ms"] += best[phase] * 1000
+
+    pipeline = sum(totals[f"{phase}_ms"] for phase in phases) / 1000
+    result.update((key, round(value, 2) if isinstance(value, float) else value)
+                  for key, value in totals.items())
+    result["commands_per_sec"] = round(totals["commands"] / pipeline) if pipeline else None
+    try:
+        import resource
+
+        # Kilobytes on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20, 1)
+    except ImportError:  # Not on Windows
+        result["peak_rss_mb"] = None
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pide.bench", description=__doc__.strip())
+    commands = parser.add_subparsers(dest="benchmark", required=True)
+
+    highlight = commands.add_parser("highlight", help="syntax highlighting of a large file")
+    highlight.add_argument("--lines", type=int, default=10000, help="document size (default 10000)")
+    highlight.add_argument("--repeat", type=int, default=3, help="runs; the best is reported")
+    highlight.set_defaults(run=bench_highlight)
+
+    open_file = commands.add_parser("open", help="loading a large file into the editor")
+    open_file.add_argument("--lines", type=int, default=100000, help="file size (default 100000)")
+    open_file.set_defaults(run=bench_open)
+
+    startup = commands.add_parser("startup", help="time from Run to a program's first output")
+    startup.add_argument("--file", default=CODE_DIR / "demo" / "hello.py", help="program to run (default code/demo/hello.py)")
+    startup.add_argument("--runs", type=int, default=10, help="runs per mode; the median is reported")
+    startup.add_argument("--settle", type=float, default=0.5, help="idle seconds before each run")
+    startup.set_defaults(run=bench_startup)
+
+    tree = commands.add_parser("tree", help="file tree update after a save, by tree size")
+    tree.add_argument("--files", type=int, nargs="+", default=[100, 1000, 5000], help="scripts in the tree (default 100 1000 5000)")
+    tree.add_argument("--saves", type=int, default=20, help="saves per size; the median is reported")
+    tree.set_defaults(run=bench_tree)
+
+    turtle = commands.add_parser("turtle", help="turtle pipeline over the shipped turtle programs")
+    turtle.add_argument("--repeat", type=int, default=3, help="runs per script; the best per phase is reported")
+    turtle.set_defaults(run=bench_turtle)
+
+    args = parser.parse_args(argv)
+    json.dump(args.run(args), sys.stdout)
+    print()
+
+
+if __name__ == "__main__":
+    main()
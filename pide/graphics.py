@@ -0,0 +1,685 @@
+"""Turtle graphics output: the canvas and the playback panel around it.
+
+MainWindow imports this module when it builds the graphics panel, after the
+editor's first paint, so these classes and the Qt graphics types they use are
+not loaded before then.
+"""
+
+import math
+from collections import deque
+
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPushButton,
+    QLabel,
+    QFrame,
+    QGraphicsView,
+    QGraphicsScene,
+    QStyleOptionGraphicsItem,
+)
+from PySide6.QtCore import Qt, QPointF, QRectF, QTimer, QElapsedTimer, Signal
+from PySide6.QtGui import (
+    QFont, QColor, QPen, QBrush, QPainter, QPainterPath, QPolygonF, QTransform, QImage,
+)
+
+
+class TurtleCanvas(QGraphicsView):
+    """Canvas for rendering turtle graphics."""
+
+    # Switch to raster mode once a drawing has produced this many primitives
+    # (segments, arcs, dots, fills, stamps and text; None = never)
+    RASTER_THRESHOLD = 1000
+
+    # Longest side of the raster image in pixels; a larger drawing is baked at a
+    # lower resolution
+    MAX_RASTER_SIZE = 4096
+
+    # The raster area is snapped to this grid (scene units), so when the image
+    # is remade the old one is copied in at a whole-pixel offset
+    RASTER_GRID = 64
+
+    def __init__(self, raster_threshold=RASTER_THRESHOLD):
+        super().__init__()
+        self.scene = QGraphicsScene()
+        self.setScene(self.scene)
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setBackgroundBrush(QBrush(QColor("white")))
+        self.setStyleSheet("border: none;")
+        
+        # Set alignment to center
+        self.setAlignment(Qt.AlignCenter)
+        
+        # Set scene rect to a reasonable default size
+        self.scene.setSceneRect(-400, -400, 800, 800)
+
+        # Turtle state
+        self.turtles = {}  # id -> (x, y, heading, visible, color)
+        self._turtle_cursors = {}  # id -> QGraphicsPolygonItem (cursor triangle)
+        self._moved_turtles = set()  # ids whose cursor is moved on the next refit
+        self._pens = {}  # (color, width) -> QPen
+
+        # Flip Y axis (turtle uses math coordinates)
+        self.setTransform(QTransform().scale(1, -1))
+        
+        # Track if we need to fit view
+        self._auto_fit = True
+
+        # Bounding rect of everything drawn, grown item by item; the view is
+        # refitted to it at most once per frame
+        self._bounds = QRectF()
+        self._fit_timer = QTimer(self)
+        self._fit_timer.setSingleShot(True)
+        self._fit_timer.setInterval(16)
+        self._fit_timer.timeout.connect(self._fit_view)
+
+        # Arc being swept on screen, advanced by GraphicsPanel's playback:
+        # (temporary item, arc command)
+        self._arc_anim = None
+
+        # Raster mode: finished items are painted into a QImage drawn as part of
+        # the background and dropped, leaving only the cursors and the arc being
+        # swept as live items. Only the image is kept, so memory stays flat
+        # however much is drawn.
+        self.raster_threshold = raster_threshold
+        self._raster_forced = False
+        self._raster = False
+        self._raster_image = None
+        self._raster_rect = QRectF()  # scene area covered by the image
+        self._raster_scale = 0.0  # image pixels per scene unit, fixed per drawing
+        self._live_items = []  # drawn items not yet baked into the image
+        self._primitive_count = 0
+
+    def _triangle_points(self, x, y, heading_deg, size=14):
+        """Return 3 (x,y) points for turtle triangle; tip in heading direction."""
+        rad = math.radians(heading_deg)
+        c, s = math.cos(rad), math.sin(rad)
+        # Local: tip (1,0), back (-1, -0.4), (-1, 0.4); scale by size/2
+        h = size / 2
+        return [
+            (x + h * c, y + h * s),
+            (x + h * (-c - 0.4 * s), y + h * (-s + 0.4 * c)),
+            (x + h * (-c + 0.4 * s), y + h * (-s - 0.4 * c)),
+        ]
+
+    def _draw_turtle_cursor(self, color):
+        """Create one turtle cursor triangle pointing east at the origin.
+
+        The item is kept for the turtle's lifetime and moved with setPos/setRotation.
+        """
+        points = self._triangle_points(0, 0, 0)
+        polygon = QPolygonF([QPointF(a, b) for a, b in points])
+        brush = QBrush(QColor(color))
+        pen = QPen(QColor("black"))
+        pen.setWidthF(0.5)
+        item = self.scene.addPolygon(polygon, pen, brush)
+        item.setZValue(1000)
+        return item
+
+    def clear(self):
+        """Clear the canvas."""
+        self._arc_anim = None
+        self.scene.clear()
+        self.turtles = {}
+        self._turtle_cursors = {}
+        self._moved_turtles = set()
+        self._bounds = QRectF()
+        self._raster = self._raster_forced
+        self._raster_image = None
+        self._raster_rect = QRectF()
+        self._raster_scale = 0.0
+        self._live_items = []
+        self._primitive_count = 0
+        self.setBackgroundBrush(QBrush(QColor("white")))
+        # Reset scene rect
+        self.scene.setSceneRect(-400, -400, 800, 800)
+        self._center_view()
+
+    def _include(self, item):
+        """Grow the drawing bounds by an item and schedule a view refit."""
+        self._bounds = self._bounds.united(item.sceneBoundingRect())
+        self._update_view()
+
+    def _add_item(self, item):
+        """Register a newly drawn primitive's item and grow the bounds by it.
+
+        Each segment, arc, dot, fill, stamp or text gets its own item, so this
+        counts primitives; raster mode starts once there are more than
+        raster_threshold of them.
+        """
+        self._live_items.append(item)
+        self._primitive_count += 1
+        if (not self._raster and self.raster_threshold is not None
+                and self._primitive_count > self.raster_threshold):
+            self._raster = True
+        self._include(item)
+
+    def set_raster_mode(self, enabled):
+        """Force raster mode on, or go back to switching automatically."""
+        self._raster_forced = enabled
+        if enabled and not self._raster:
+            self._raster = True
+            self._update_view()
+
+    def _paint_items(self, painter, items):
+        """Paint graphics items with their scene transforms."""
+        option = QStyleOptionGraphicsItem()
+        for item in items:
+            painter.save()
+            painter.setTransform(item.sceneTransform(), True)
+            item.paint(painter, option, None)
+            painter.restore()
+
+    def _image_painter(self):
+        """Return a QPainter mapping scene coordinates onto the raster image."""
+        painter = QPainter(self._raster_image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.scale(self._raster_scale, self._raster_scale)
+        painter.translate(-self._raster_rect.left(), -self._raster_rect.top())
+        return painter
+
+    def _rasterize(self):
+        """Bake finished items into the raster image.
+
+        The image keeps one resolution for the whole drawing: the view scale
+        when raster mode started, halved whenever the image would exceed
+        MAX_RASTER_SIZE. When the drawing outgrows the area covered, a larger
+        image is made and the old one copied in pixel for pixel (or reduced
+        2:1 when the resolution halves), so baked lines are not resampled each
+        time the view zooms out.
+        """
+        if self._raster_image is None or not self._raster_rect.contains(self._bounds):
+            old_image, old_rect, old_scale = self._raster_image, self._raster_rect, self._raster_scale
+            if not self._raster_scale:
+                self._raster_scale = abs(self.transform().m11()) * self.devicePixelRatioF()
+                if self._raster_scale <= 0:
+                    return
+            # Leave room to grow so the image is not remade every frame
+            w, h = self._bounds.width(), self._bounds.height()
+            grid = self.RASTER_GRID
+            left = math.floor((self._bounds.left() - w / 2 - 50) / grid) * grid
+            top = math.floor((self._bounds.top() - h / 2 - 50) / grid) * grid
+            right = math.ceil((self._bounds.right() + w / 2 + 50) / grid) * grid
+            bottom = math.ceil((self._bounds.bottom() + h / 2 + 50) / grid) * grid
+            self._raster_rect = QRectF(left, top, right - left, bottom - top)
+            longest = max(self._raster_rect.width(), self._raster_rect.height())
+            while longest * self._raster_scale > self.MAX_RASTER_SIZE:
+                self._raster_scale /= 2
+            size = self._raster_rect.size() * self._raster_scale
+            self._raster_image = QImage(
+                max(round(size.width()), 1), max(round(size.height()), 1),
+                QImage.Format.Format_ARGB32_Premultiplied,
+            )
+            self._raster_image.fill(Qt.transparent)
+            if old_image is not None:
+                offset = (old_rect.topLeft() - self._raster_rect.topLeft()) * self._raster_scale
+                painter = QPainter(self._raster_image)
+                if old_scale == self._raster_scale:
+                    painter.drawImage(offset.toPoint(), old_image)
+                else:
+                    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+                    painter.drawImage(QRectF(offset, old_rect.size() * self._raster_scale), old_image)
+                painter.end()
+
+        if self._live_items:
+            painter = self._image_painter()
+            self._paint_items(painter, self._live_items)
+            painter.end()
+            for item in self._live_items:
+                self.scene.removeItem(item)
+            self._live_items = []
+        self.viewport().update()
+
+    def drawBackground(self, painter, rect):
+        """Draw the background and, in raster mode, the baked drawing."""
+        super().drawBackground(painter, rect)
+        if self._raster_image is not None:
+            painter.save()
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(self._raster_rect, self._raster_image)
+            painter.restore()
+
+    def _update_view(self):
+        """Schedule a refit of the view; coalesced to at most once per frame."""
+        if not self._fit_timer.isActive():
+            self._fit_timer.start()
+
+    def _fit_view(self):
+        """Fit the view to all drawn items and keep centered."""
+        self._move_cursors()
+        if not self._bounds.isNull():
+            # Add some padding
+            rect = self._bounds.adjusted(-50, -50, 50, 50)
+            self.scene.setSceneRect(rect)
+            # Fit view while maintaining aspect ratio
+            self.fitInView(rect, Qt.AspectRatioMode.KeepAspectRatio)
+            if self._raster:
+                self._rasterize()
+    
+    def _center_view(self):
+        """Center the view on the scene."""
+        self._update_view()
+    
+    def resizeEvent(self, event):
+        """Handle resize to keep view centered."""
+        super().resizeEvent(event)
+        if self._auto_fit:
+            self._center_view()
+
+    def set_bgcolor(self, color):
+        """Set background color."""
+        self.setBackgroundBrush(QBrush(QColor(color)))
+
+    def _make_pen(self, color, width):
+        key = (color, width)
+        pen = self._pens.get(key)
+        if pen is None:
+            if len(self._pens) > 256:
+                self._pens.clear()  # e.g. a colour per line
+            pen = QPen(QColor(color))
+            pen.setWidthF(width)
+            pen.setCapStyle(Qt.RoundCap)
+            pen.setJoinStyle(Qt.RoundJoin)
+            self._pens[key] = pen
+        return pen
+
+    def draw_line(self, x1, y1, x2, y2, color, width):
+        """Draw a line."""
+        # Update view to include new line
+        self._add_item(self.scene.addLine(x1, y1, x2, y2, self._make_pen(color, width)))
+
+    @staticmethod
+    def _arc_point(cx, cy, radius, angle):
+        rad = math.radians(angle)
+        return cx + radius * math.cos(rad), cy + radius * math.sin(rad)
+
+    @staticmethod
+    def _arc_path(cx, cy, radius, start, span):
+        """Return a path for an arc; angles in degrees, counter-clockwise in turtle space."""
+        rect = QRectF(cx - radius, cy - radius, 2 * radius, 2 * radius)
+        path = QPainterPath(QPointF(*TurtleCanvas._arc_point(cx, cy, radius, start)))
+        # Qt measures arc angles with y pointing down, i.e. mirrored
+        path.arcTo(rect, -start, -span)
+        return path
+
+    def draw_arc(self, turtle_id, cx, cy, radius, start, span, color, width, animate=False):
+        """Draw an arc of a circle; if animate, it is swept through advance_arc()."""
+        self.finish_arc()
+        if not animate:
+            self._append_arc(cx, cy, radius, start, span, color, width)
+            return
+        item = self.scene.addPath(QPainterPath(), self._make_pen(color, width))
+        self._arc_anim = (item, (turtle_id, cx, cy, radius, start, span, color, width))
+
+    def _append_arc(self, cx, cy, radius, start, span, color, width):
+        path = self._arc_path(cx, cy, radius, start, span)
+        self._add_item(self.scene.addPath(path, self._make_pen(color, width)))
+
+    def advance_arc(self, fraction):
+        """Extend the arc being swept to fraction (0..1) and move its turtle along it."""
+        if self._arc_anim is None:
+            return
+        if fraction >= 1.0:
+            self.finish_arc()
+            return
+        item, (turtle_id, cx, cy, radius, start, span, color, width) = self._arc_anim
+        item.setPath(self._arc_path(cx, cy, radius, start, span * fraction))
+        angle = start + span * fraction
+        state = self.turtles.get(turtle_id)
+        if state is not None:
+            x, y = self._arc_point(cx, cy, radius, angle)
+            heading = angle + (90 if span >= 0 else -90)
+            self.update_turtle(turtle_id, x, y, heading, state[3], state[4])
+
+    def finish_arc(self):
+        """Complete an arc still being swept, e.g. when the next command is played."""
+        if self._arc_anim is None:
+            return
+        item, (turtle_id, cx, cy, radius, start, span, color, width) = self._arc_anim
+        self._arc_anim = None
+        self.scene.removeItem(item)
+        self._append_arc(cx, cy, radius, start, span, color, width)
+
+    def draw_dot(self, x, y, size, color):
+        """Draw a dot."""
+        brush = QBrush(QColor(color))
+        pen = QPen(Qt.NoPen)
+        r = size / 2
+        # Update view to include new dot
+        self._add_item(self.scene.addEllipse(x - r, y - r, size, size, pen, brush))
+
+    def draw_fill(self, points, color):
+        """Draw a filled polygon."""
+        polygon = QPolygonF([QPointF(x, y) for x, y in points])
+        brush = QBrush(QColor(color))
+        pen = QPen(Qt.NoPen)
+        # Update view to include new polygon
+        self._add_item(self.scene.addPolygon(polygon, pen, brush))
+
+    def draw_text(self, x, y, text, color, font_name, font_size, align):
+        """Draw text."""
+        text_item = self.scene.addText(text)
+        text_item.setDefaultTextColor(QColor(color))
+        font = QFont(font_name)
+        if font_size > 0:
+            font.setPointSizeF(font_size)
+        text_item.setFont(font)
+        # Flip text back (since view is flipped)
+        text_item.setTransform(QTransform().scale(1, -1))
+        text_item.setPos(x, y)
+        # Update view to include new text
+        self._add_item(text_item)
+
+    def update_turtle(self, turtle_id, x, y, heading, visible, color):
+        """Update turtle position; its cursor is moved on the next refit.
+
+        A turtle usually moves many times per frame, so only where it is at
+        the end of the frame is shown.
+        """
+        self.turtles[turtle_id] = (x, y, heading, visible, color)
+        self._moved_turtles.add(turtle_id)
+        self._update_view()
+
+    def _move_cursors(self):
+        """Show, hide and move the cursors of the turtles updated since the last refit."""
+        for turtle_id in self._moved_turtles:
+            x, y, heading, visible, color = self.turtles[turtle_id]
+            item = self._turtle_cursors.get(turtle_id)
+            if item is None:
+                if not visible:
+                    continue
+                item = self._turtle_cursors[turtle_id] = self._draw_turtle_cursor(color)
+            elif item.brush().color() != QColor(color):
+                item.setBrush(QBrush(QColor(color)))
+            item.setVisible(visible)
+            if visible:
+                item.setPos(x, y)
+                item.setRotation(heading)
+                self._bounds = self._bounds.united(item.sceneBoundingRect())
+        self._moved_turtles.clear()
+
+    def draw_stamp(self, x, y, heading, color):
+        """Draw a stamp (fixed triangle) at position."""
+        points = self._triangle_points(x, y, heading, size=12)
+        polygon = QPolygonF([QPointF(a, b) for a, b in points])
+        brush = QBrush(QColor(color))
+        pen = QPen(QColor("black"))
+        pen.setWidthF(0.5)
+        self._add_item(self.scene.addPolygon(polygon, pen, brush))
+
+    def process_command(self, cmd):
+        """Process a turtle drawing command."""
+        cmd_type = cmd.get("type")
+        if self._arc_anim is not None:
+            # Playback has moved on; complete the arc being swept
+            self.finish_arc()
+
+        if cmd_type == "line":
+            self.draw_line(cmd["x1"], cmd["y1"], cmd["x2"], cmd["y2"],
+                          cmd["color"], cmd["width"])
+        elif cmd_type == "arc":
+            self.draw_arc(cmd["id"], cmd["cx"], cmd["cy"], cmd["radius"], cmd["start"],
+                          cmd["span"], cmd["color"], cmd["width"], cmd.get("duration", 0) > 0)
+        elif cmd_type == "dot":
+            self.draw_dot(cmd["x"], cmd["y"], cmd["size"], cmd["color"])
+        elif cmd_type == "fill":
+            self.draw_fill(cmd["points"], cmd["color"])
+        elif cmd_type == "text":
+            self.draw_text(cmd["x"], cmd["y"], cmd["text"], cmd["color"],
+                          cmd["font"], cmd["size"], cmd["align"])
+        elif cmd_type == "bgcolor":
+            self.set_bgcolor(cmd["color"])
+        elif cmd_type == "clear" or cmd_type == "reset":
+            self.clear()
+        elif cmd_type == "turtle_update":
+            self.update_turtle(cmd["id"], cmd["x"], cmd["y"],
+                              cmd["heading"], cmd["visible"], cmd["pen_color"])
+        elif cmd_type == "stamp":
+            self.draw_stamp(cmd["x"], cmd["y"], cmd["heading"], cmd["color"])
+        elif cmd_type == "done":
+            pass  # Program finished
+
+
+class GraphicsPanel(QFrame):
+    """Right panel for graphics output (PyTurtle/Pygame).
+
+    Turtle commands arrive as fast as the program produces them and are played
+    back here on a frame timer: a command's "delay" (an arc's "duration") is how
+    long playback waits before the next one. Commands without a delay (speed(0))
+    that arrive while playback is caught up skip the queue and are drawn as the
+    batch comes in. What a run draws is kept (up to MAX_HISTORY commands), so
+    playback can be paused, skipped to the end or replayed.
+
+    The program never waits for playback, so the queue is bounded: past
+    QUEUE_HIGH commands, backlog_changed asks the output reader to stop reading
+    the graphics pipe, which blocks the program once the pipe is full, until
+    playback is back under QUEUE_LOW. Commands past QUEUE_MAX (output that
+    cannot be throttled) are drawn at once.
+    """
+
+    FRAME_MS = 16
+    FRAME_BUDGET_MS = 12  # Max time spent applying commands per frame
+
+    MAX_HISTORY = 50000  # Longer runs cannot be replayed
+    QUEUE_HIGH = 10000
+    QUEUE_LOW = 2000
+    QUEUE_MAX = 50000
+
+    backlog_changed = Signal(bool)  # True: stop taking graphics from the program
+
+    def __init__(self):
+        super().__init__()
+        self.setFrameStyle(QFrame.NoFrame)
+        self.setStyleSheet("""
+            QFrame {
+                background-color: #21252B;
+                border: none;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # Header with playback controls
+        header_bar = QWidget()
+        header_bar.setStyleSheet("""
+            QWidget {
+                background-color: #282C34;
+            }
+            QLabel {
+                color: #ABB2BF;
+                font-size: 12px;
+                padding: 6px;
+            }
+            QPushButton {
+                color: #ABB2BF;
+                font-size: 11px;
+                padding: 2px 6px;
+                border: none;
+                border-radius: 3px;
+            }
+            QPushButton:hover {
+                background-color: #3E4451;
+            }
+        """)
+        header_layout = QHBoxLayout(header_bar)
+        header_layout.setContentsMargins(4, 0, 4, 0)
+        header_layout.setSpacing(2)
+        header = QLabel("Graphics Output")
+        header_layout.addWidget(header)
+        header_layout.addStretch()
+        self.pause_btn = QPushButton("⏸ Pause")
+        self.pause_btn.setToolTip("Pause or resume the drawing")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        header_layout.addWidget(self.pause_btn)
+        self.skip_btn = QPushButton("⏭ Skip")
+        self.skip_btn.setToolTip("Show everything drawn so far")
+        self.skip_btn.clicked.connect(self.skip)
+        header_layout.addWidget(self.skip_btn)
+        self.replay_btn = QPushButton("↺ Replay")
+        self.replay_btn.setToolTip("Draw the last run again")
+        self.replay_btn.clicked.connect(self.replay)
+        header_layout.addWidget(self.replay_btn)
+        layout.addWidget(header_bar)
+
+        # Turtle canvas
+        self.canvas = TurtleCanvas()
+        layout.addWidget(self.canvas)
+
+        # Playback state. Times are seconds on a playback clock that only runs
+        # while frames are being played and playback is not paused.
+        self._history = []  # every command of the current run, for replay; None past MAX_HISTORY
+        self._queue = deque()  # commands not played yet
+        self._throttled = False  # backlog_changed(True) was the last emitted
+        self._now = 0.0
+        self._next_time = 0.0  # when the next queued command may be played
+        self._arc = None  # (start time, duration) of the arc being swept
+        self._paused = False
+        self._skipping = 0  # queued commands still to be played without waiting
+        self._clock = QElapsedTimer()
+        self._play_timer = QTimer(self)
+        self._play_timer.setInterval(self.FRAME_MS)
+        self._play_timer.timeout.connect(self._play)
+
+        self.setMinimumWidth(250)
+
+    def clear(self):
+        """Clear the graphics panel and forget the previous run."""
+        self._play_timer.stop()
+        self._history = []
+        self.replay_btn.setEnabled(True)
+        self._queue.clear()
+        self._set_throttled(False)
+        self._arc = None
+        self._skipping = 0
+        self._now = self._next_time = 0.0
+        self._set_paused(False)
+        self.canvas.clear()
+
+    def process_command(self, cmd):
+        """Queue a turtle drawing command for playback."""
+        self.enqueue([cmd])
+
+    def enqueue(self, cmds):
+        """Queue turtle drawing commands for playback."""
+        if self._history is not None:
+            if len(self._history) + len(cmds) > self.MAX_HISTORY:
+                self._history = None
+                self.replay_btn.setEnabled(False)
+            else:
+                self._history.extend(cmds)
+        if (not self._queue and self._arc is None and not self._paused
+                and self._next_time <= self._now):
+            cmds = self._draw_instant(cmds)
+            if not cmds:
+                return
+        self._queue.extend(cmds)
+        if len(self._queue) > self.QUEUE_HIGH:
+            self._set_throttled(True)
+        if len(self._queue) > self.QUEUE_MAX:
+            self._play_now(len(self._queue) - self.QUEUE_HIGH)
+        if not self._play_timer.isActive():
+            self._clock.start()  # Time spent idle does not count
+            self._play_timer.start()
+
+    def toggle_pause(self):
+        """Pause or resume playback."""
+        self._set_paused(not self._paused)
+
+    def _set_paused(self, paused):
+        self._paused = paused
+        self.pause_btn.setText("▶ Resume" if paused else "⏸ Pause")
+
+    def _set_throttled(self, throttled):
+        if throttled != self._throttled:
+            self._throttled = throttled
+            self.backlog_changed.emit(throttled)
+
+    def _draw_instant(self, cmds):
+        """Draw the leading commands without a delay, for one frame at most.
+
+        Returns the commands left over for the queue.
+        """
+        budget = QElapsedTimer()
+        budget.start()
+        for i, cmd in enumerate(cmds):
+            if (cmd.get("duration" if cmd.get("type") == "arc" else "delay", 0) > 0
+                    or budget.elapsed() > self.FRAME_BUDGET_MS):
+                return cmds[i:]
+            self._apply(cmd)
+        return []
+
+    def skip(self):
+        """Play every queued command without waiting, a frame's worth at a time."""
+        self.canvas.finish_arc()
+        self._arc = None
+        self._skipping = len(self._queue)
+
+    def _play_now(self, count):
+        """Play the next count queued commands at once (output past QUEUE_MAX)."""
+        self.canvas.finish_arc()
+        self._arc = None
+        for _ in range(count):
+            self._apply_now(self._queue.popleft())
+        self._skipping = max(self._skipping - count, 0)
+
+    def replay(self):
+        """Play the current run's commands again from the start."""
+        if self._history is None:
+            return
+        history = self._history
+        self.clear()
+        self.enqueue(history)
+
+    def _apply_now(self, cmd):
+        """Apply a command without its delay; an arc is drawn whole."""
+        if cmd.get("type") == "arc":
+            cmd = dict(cmd, duration=0)
+        self._apply(cmd)
+
+    def _apply(self, cmd):
+        try:
+            self.canvas.process_command(cmd)
+        except (KeyError, TypeError, ValueError):
+            pass  # A malformed command, e.g. a pen width the program gave as "wide"
+
+    def _play(self):
+        """Play the commands that are due on this frame."""
+        elapsed = self._clock.restart() / 1000
+        if not self._paused:
+            self._now += elapsed
+        budget = QElapsedTimer()
+        budget.start()
+        while self._skipping and budget.elapsed() <= self.FRAME_BUDGET_MS:
+            self._apply_now(self._queue.popleft())
+            self._skipping -= 1
+            if not self._skipping:
+                self._next_time = self._now
+        while not self._skipping:
+            if self._arc is not None:
+                start, duration = self._arc
+                fraction = (self._now - start) / duration
+                self.canvas.advance_arc(fraction)
+                if fraction < 1.0:
+                    break
+                self._arc = None
+            if (self._paused or not self._queue or self._next_time > self._now
+                    or budget.elapsed() > self.FRAME_BUDGET_MS):
+                break
+            cmd = self._queue.popleft()
+            self._apply(cmd)
+            is_arc = cmd.get("type") == "arc"
+            delay = cmd.get("duration" if is_arc else "delay", 0)
+            if delay > 0:
+                if is_arc:
+                    self._arc = (self._next_time, delay)
+                self._next_time += delay
+        if len(self._queue) < self.QUEUE_LOW:
+            self._set_throttled(False)
+        if not self._queue and self._arc is None:
+            self._play_timer.stop()
+            # Waiting for more output: don't let the next command play early
+            # to catch up, nor late because of time spent idle
+            self._next_time = max(self._next_time, self._now)
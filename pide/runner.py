@@ -0,0 +1,189 @@
+"""
+Pide Runner - A pre-started interpreter that waits for the code to run.
+
+The IDE starts a few of these ahead of time (WorkerPool in app.py) so pressing Run
+does not wait for interpreter startup and common imports. The code arrives on
+stdin as a line holding its length in bytes followed by the UTF-8 source; after
+that stdin belongs to the program (input()). The code runs as if started with
+``python -u -c code``: same sys.argv, sys.path and tracebacks.
+
+With ``--fork-server FD`` it instead becomes a long-lived fork server (Linux; see
+ForkServer in app.py). It preloads once, then for every run receives the child's
+stdin, stdout, stderr and graphics pipe over the Unix socket FD and forks a
+child that wires them up and reads its code from stdin as above. The server
+answers ``started <pid>`` per run and ``exit <pid> <code>`` when a child ends.
+
+This module runs in the user's process, so it must only depend on the standard
+library.
+"""
+
+import gc
+import importlib.machinery
+import os
+import select
+import signal
+import socket
+import sys
+import traceback
+import types
+
+# Modules commonly used by the lessons, imported while waiting
+PRELOAD = ("math", "random", "time", "json", "turtle_protocol", "turtle_backend")
+
+_PIDE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _preload():
+    """Import PRELOAD; the pide directory is only on sys.path meanwhile."""
+    sys.path.insert(0, _PIDE_DIR)
+    try:
+        for name in PRELOAD:
+            try:
+                __import__(name)
+            except Exception:
+                pass  # The program will report it if it needs the module
+    finally:
+        sys.path.remove(_PIDE_DIR)
+
+
+def _drop_shadowed():
+    """Forget preloaded modules that the working directory has its own version of.
+
+    The program's imports start from the working directory, so a random.py
+    there must win over the preloaded random, even if it was created after
+    the preload.
+    """
+    cwd = os.getcwd()
+    for name in PRELOAD:
+        module = sys.modules.get(name)
+        path = getattr(module, "__file__", None)
+        if path is None or os.path.dirname(path) == _PIDE_DIR:
+            # Built in, which the path cannot shadow; or the IDE's own module,
+            # which the program imports with the pide directory first on sys.path
+            continue
+        spec = importlib.machinery.PathFinder.find_spec(name, [cwd])
+        if spec is not None and spec.loader is not None:
+            for loaded in [m for m in sys.modules if m == name or m.startswith(name + ".")]:
+                del sys.modules[loaded]
+
+
+def _read_code():
+    """Wait for the code to run; exit quietly if the IDE closes the pipe instead."""
+    header = sys.stdin.buffer.readline()
+    if not header.strip():
+        sys.exit(0)
+    size = int(header)
+    return sys.stdin.buffer.read(size).decode("utf-8")
+
+
+def _run(code):
+    """Run code as the __main__ module; returns the exit status."""
+    sys.argv = ["-c"]
+    module = types.ModuleType("__main__")
+    sys.modules["__main__"] = module
+    try:
+        exec(compile(code, "<string>", "exec"), module.__dict__)
+    except SystemExit:
+        raise
+    except BaseException:
+        exc_type, exc, tb = sys.exc_info()
+        # Leave this module's frame out, as python -c would
+        traceback.print_exception(exc_type, exc, tb.tb_next)
+        return 1
+    return 0
+
+
+def _reap(sock):
+    """Report every child that has exited."""
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        sock.sendall(b"exit %d %d" % (pid, os.waitstatus_to_exitcode(status)))
+
+
+def _become_child(sock, wakeup_fds, fds):
+    """In a freshly forked child: take over the run's pipes and run its code."""
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    # Lead a process group, so stopping the run also ends what it started
+    os.setpgrp()
+    sock.close()
+    for fd in wakeup_fds:
+        os.close(fd)
+    stdin, stdout, stderr, graphics = fds
+    for fd, target in ((stdin, 0), (stdout, 1), (stderr, 2)):
+        os.dup2(fd, target)
+        os.close(fd)
+    # Point the preloaded turtle backend at this run's graphics pipe
+    backend = sys.modules.get("turtle_backend")
+    if backend is not None:
+        os.environ[backend.turtle_protocol.CHANNEL_ENV] = str(graphics)
+        backend._channel = backend._open_channel()
+    else:
+        os.close(graphics)
+    # Children would otherwise all continue the server's random sequence
+    if "random" in sys.modules:
+        sys.modules["random"].seed()
+    code = _read_code()
+    _drop_shadowed()
+    sys.exit(_run(code))
+
+
+def serve(fd):
+    """Fork server loop: one child per request on socket fd, until it closes."""
+    sock = socket.socket(fileno=fd)
+    # Warm up the compiler, then move everything loaded so far out of the
+    # collector's reach; either would otherwise write to shared pages in each child
+    compile("print(1)", "<string>", "exec")
+    gc.freeze()
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    while True:
+        ready, _, _ = select.select([sock, wakeup_r], [], [])
+        if wakeup_r in ready:
+            os.read(wakeup_r, 512)
+            _reap(sock)
+        if sock in ready:
+            try:
+                msg, fds, _, _ = socket.recv_fds(sock, 64, 4)
+            except OSError:
+                msg, fds = b"", []
+            if not msg:
+                return  # The IDE has gone
+            if len(fds) != 4:
+                for received in fds:
+                    os.close(received)
+                continue
+            pid = os.fork()
+            if pid == 0:
+                _become_child(sock, (wakeup_r, wakeup_w), fds)
+            for received in fds:
+                os.close(received)
+            sock.sendall(b"started %d" % pid)
+
+
+def main():
+    # Preload before the working directory is on sys.path, so the user's own
+    # random.py or json.py is not what gets preloaded
+    _preload()
+    # As with -c, the program's imports start from the working directory
+    sys.path[0] = ""
+    if len(sys.argv) == 3 and sys.argv[1] == "--fork-server":
+        serve(int(sys.argv[2]))
+        return
+    if hasattr(os, "setpgrp"):
+        # As in a forked child: stopping the run ends its whole process group
+        os.setpgrp()
+    code = _read_code()
+    _drop_shadowed()
+    sys.exit(_run(code))
+
+
+if __name__ == "__main__":
+    main()
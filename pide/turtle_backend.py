@@ -2,23 +2,112 @@
 Pide Turtle Backend - A turtle graphics implementation that outputs drawing commands.
 
 This module provides a turtle graphics API compatible with Python's standard turtle module,
-but instead of drawing to a Tk window, it outputs JSON commands that can be rendered
-by the Pide graphics panel.
+but instead of drawing to a Tk window, it outputs drawing commands (JSON, or the
+compact binary records of turtle_protocol when the IDE asks for them) that can be
+rendered by the Pide graphics panel.
+
+The program never sleeps to animate: moves carry a "delay" (derived from speed())
+and the graphics panel plays them back at that pace.
 """
 
+import atexit
+import base64
 import json
 import math
+import os
 import sys
-import time
+
+if __package__:
+    from . import turtle_protocol
+else:  # Loaded from the pide directory as a top-level module
+    import turtle_protocol
 
 # Global state
 _turtles = []
 _screen = None
 
+# Tracer state: commands are sent on every n-th screen update (0 = only on update())
+_tracer_n = 1
+_update_count = 0
+_pending = []  # buffered drawing commands while tracing is off
+_pending_updates = {}  # turtle id -> latest buffered turtle_update
+
+# Wire format negotiated with the IDE at process start; JSON unless binary is requested
+_encoder = None
+if os.environ.get(turtle_protocol.PROTOCOL_ENV) == "binary":
+    _encoder = turtle_protocol.Encoder()
+
+
+def _open_channel():
+    """Open the dedicated graphics pipe passed in by the IDE, if any."""
+    fd = os.environ.get(turtle_protocol.CHANNEL_ENV)
+    if not fd:
+        return None
+    try:
+        fd = int(fd)
+        os.set_inheritable(fd, False)  # keep it out of the user's own subprocesses
+        return os.fdopen(fd, "wb")
+    except (ValueError, OSError):
+        return None
+
+
+_channel = _open_channel()
+
+
+def _write(cmds):
+    """Write a batch of commands with a single flush."""
+    if not cmds:
+        return
+    if _channel is not None:
+        if _encoder is not None:
+            data = b"".join(_encoder.encode(cmd) for cmd in cmds)
+        else:
+            data = "".join(f"{json.dumps(cmd)}\n" for cmd in cmds).encode()
+        _channel.write(data)
+        _channel.flush()
+        return
+
+    # No graphics channel: multiplex prefixed lines into stdout
+    if _encoder is not None:
+        frame = b"".join(_encoder.encode(cmd) for cmd in cmds)
+        data = f"{turtle_protocol.BINARY_PREFIX}{base64.b64encode(frame).decode()}\n"
+    else:
+        prefix = turtle_protocol.JSON_PREFIX
+        data = "".join(f"{prefix}{json.dumps(cmd)}\n" for cmd in cmds)
+    sys.stdout.write(data)
+    sys.stdout.flush()
+
 
 def _emit(cmd):
-    """Emit a drawing command as JSON to stdout."""
-    print(f"__PIDE_TURTLE__:{json.dumps(cmd)}", flush=True)
+    """Emit a drawing command, buffering it while the tracer is off."""
+    if _tracer_n == 1:
+        _write([cmd])
+    elif cmd["type"] == "turtle_update":
+        # Only the final cursor state of a frame is worth sending
+        _pending_updates[cmd["id"]] = cmd
+    else:
+        _pending.append(cmd)
+
+
+def _flush():
+    """Send all buffered commands to the GUI as one frame."""
+    global _pending, _pending_updates
+    cmds = _pending + list(_pending_updates.values())
+    _pending = []
+    _pending_updates = {}
+    _write(cmds)
+
+
+def _screen_updated():
+    """Count a screen update and flush every n-th one (tracer(n) semantics)."""
+    global _update_count
+    if _tracer_n > 1:
+        _update_count += 1
+        if _update_count % _tracer_n == 0:
+            _flush()
+
+
+atexit.register(_flush)
 
 
 class Vec2:
@@ -46,14 +135,21 @@ class Turtle:
         _emit({"type": "turtle_create", "id": id(self)})
         self._update_turtle()
 
-    def _delay(self):
-        """Sleep based on speed() so animation is visible. 0=no delay, 1=slowest, 10=fast."""
+    def _step_time(self):
+        """Seconds one animation step takes: 0=no delay, 1=slowest, 10=fast."""
+        if _tracer_n != 1:
+            return 0  # Not animating: frames are only shown on update()
         if 1 <= self._speed_val <= 10:
             # ~0.12s at 1, ~0.01s at 10
-            time.sleep(0.13 - 0.012 * self._speed_val)
+            return 0.13 - 0.012 * self._speed_val
+        return 0
+
+    def _update_turtle(self, delay=0):
+        """Send turtle state update.
 
-    def _update_turtle(self):
-        """Send turtle state update."""
+        delay is how long (in seconds) the GUI should keep this frame on screen
+        before playing the next command; the program itself never waits.
+        """
         _emit({
             "type": "turtle_update",
             "id": id(self),
@@ -62,7 +158,9 @@ class Turtle:
             "heading": self._heading,
             "visible": self._visible,
             "pen_color": self._pen_color,
+            "delay": delay,
         })
+        _screen_updated()
 
     def forward(self, distance):
         """Move forward by distance pixels."""
@@ -87,8 +185,7 @@ class Turtle:
         if self._filling:
             self._fill_points.append((new_x, new_y))
 
-        self._update_turtle()
-        self._delay()
+        self._update_turtle(self._step_time())
 
     fd = forward
 
@@ -102,16 +199,14 @@ class Turtle:
     def right(self, angle):
         """Turn right by angle degrees."""
         self._heading -= angle
-        self._update_turtle()
-        self._delay()
+        self._update_turtle(self._step_time())
 
     rt = right
 
     def left(self, angle):
         """Turn left by angle degrees."""
         self._heading += angle
-        self._update_turtle()
-        self._delay()
+        self._update_turtle(self._step_time())
 
     lt = left
 
@@ -137,8 +232,7 @@ class Turtle:
         if self._filling:
             self._fill_points.append((x, y))
 
-        self._update_turtle()
-        self._delay()
+        self._update_turtle(self._step_time())
 
     setpos = goto
     setposition = goto
@@ -154,8 +248,7 @@ class Turtle:
     def setheading(self, angle):
         """Set heading to angle degrees."""
         self._heading = angle
-        self._update_turtle()
-        self._delay()
+        self._update_turtle(self._step_time())
 
     seth = setheading
 
@@ -165,9 +258,10 @@ class Turtle:
         self.setheading(90)
 
     def circle(self, radius, extent=360, steps=None):
-        """Draw a circle or arc."""
+        """Draw a circle or arc (a polygon when steps is given)."""
         if steps is None:
-            steps = max(int(abs(extent) / 3), 20)
+            self._arc(radius, extent)
+            return
 
         step_angle = extent / steps
         step_length = 2 * math.pi * radius * abs(extent) / 360 / steps
@@ -179,6 +273,48 @@ class Turtle:
             else:
                 self.right(-step_angle)
 
+    def _arc(self, radius, extent):
+        """Move along a true arc, sent to the GUI as a single arc command.
+
+        The centre is radius units to the turtle's left (right if negative), as in
+        the standard turtle module. The GUI animates the sweep over the time the
+        equivalent forward/left steps would have taken.
+        """
+        rad = math.radians(self._heading)
+        cx = self._pos.x - radius * math.sin(rad)
+        cy = self._pos.y + radius * math.cos(rad)
+        r = abs(radius)
+        # Angle of the turtle as seen from the centre, and signed sweep (CCW > 0)
+        start = self._heading - 90 if radius >= 0 else self._heading + 90
+        span = extent if radius >= 0 else -extent
+        steps = max(int(abs(extent) / 3), 20)
+        duration = 2 * steps * self._step_time()
+
+        if self._pen_down:
+            _emit({
+                "type": "arc",
+                "id": id(self),
+                "cx": cx,
+                "cy": cy,
+                "radius": r,
+                "start": start,
+                "span": span,
+                "color": self._pen_color,
+                "width": self._pen_size,
+                "duration": duration,
+            })
+
+        if self._filling:
+            for i in range(1, steps + 1):
+                a = math.radians(start + span * i / steps)
+                self._fill_points.append((cx + r * math.cos(a), cy + r * math.sin(a)))
+
+        end = math.radians(start + span)
+        self._pos.x = cx + r * math.cos(end)
+        self._pos.y = cy + r * math.sin(end)
+        self._heading += span
+        self._update_turtle()
+
     def dot(self, size=None, color=None):
         """Draw a dot."""
         if size is None:
@@ -192,8 +328,8 @@ class Turtle:
             "y": self._pos.y,
             "size": size,
             "color": color,
+            "delay": self._step_time(),
         })
-        self._delay()
 
     def stamp(self):
         """Stamp turtle shape (simplified as triangle)."""
@@ -203,8 +339,8 @@ class Turtle:
             "y": self._pos.y,
             "heading": self._heading,
             "color": self._pen_color,
+            "delay": self._step_time(),
         })
-        self._delay()
 
     def penup(self):
         """Lift pen up."""
@@ -391,24 +527,33 @@ class Screen:
             self.bgcolor(bg)
 
     def tracer(self, n=None, delay=None):
-        """Set tracer (no-op in embedded mode)."""
-        pass
+        """Set or return tracer: show every n-th update, 0 = only on update()."""
+        global _tracer_n, _update_count
+        if n is None:
+            return _tracer_n
+        _tracer_n = max(int(n), 0)
+        _update_count = 0
+        if _tracer_n:
+            self.update()
 
     def update(self):
-        """Update screen (no-op in embedded mode)."""
-        pass
+        """Send all buffered drawing commands as one frame."""
+        _flush()
 
     def bye(self):
         """Close the screen."""
         _emit({"type": "done"})
+        _flush()
 
     def exitonclick(self):
         """Wait for click then exit (simplified)."""
         _emit({"type": "done"})
+        _flush()
 
     def mainloop(self):
         """Enter main loop (no-op)."""
         _emit({"type": "done"})
+        _flush()
 
     done = mainloop
 
@@ -496,7 +641,7 @@ def setup(width=None, height=None, startx=None, starty=None):
     _get_screen().setup(width, height, startx, starty)
 def screensize(canvwidth=None, canvheight=None, bg=None):
     _get_screen().screensize(canvwidth, canvheight, bg)
-def tracer(n=None, delay=None): _get_screen().tracer(n, delay)
+def tracer(n=None, delay=None): return _get_screen().tracer(n, delay)
 def update(): _get_screen().update()
 def bye(): _get_screen().bye()
 def exitonclick(): _get_screen().exitonclick()
@@ -0,0 +1,252 @@
+"""
+Pide Turtle Protocol - Wire formats for turtle drawing commands.
+
+Commands are plain dicts (``{"type": "line", "x1": ..., ...}``). They travel from
+the user's process to the IDE over a dedicated pipe (or, failing that, prefixed
+lines in stdout), either as JSON lines or, when the IDE asks for it
+through the ``PIDE_TURTLE_PROTOCOL`` environment variable, as compact binary
+records: one opcode byte followed by a fixed little-endian layout of float32
+values. Colours, fonts and turtle ids are interned: each distinct value is sent
+once as a definition record and afterwards referenced by a uint32 index. Text
+written on the canvas is rarely repeated, so it is sent inline instead. A
+command whose values do not fit its layout (a number beyond float32, a size
+given as "8") is sent as a JSON record instead.
+
+This module is shared by the turtle backend (running in the user's process) and
+the IDE, so it must only depend on the standard library.
+"""
+
+import json
+import struct
+
+# Line prefixes used when commands are multiplexed into stdout
+JSON_PREFIX = "__PIDE_TURTLE__:"
+BINARY_PREFIX = "__PIDE_TURTLE_B__:"  # followed by a base64 frame of binary records
+
+# Environment variable the IDE sets to select the wire format ("json" or "binary")
+PROTOCOL_ENV = "PIDE_TURTLE_PROTOCOL"
+
+# Environment variable holding an inherited file descriptor for a dedicated
+# graphics channel. Commands written there are not prefixed: raw binary records,
+# or JSON lines in json mode. Without it, commands are multiplexed into stdout.
+CHANNEL_ENV = "PIDE_TURTLE_FD"
+
+# Opcode 0 defines an interned string: index (uint32), length (uint32), UTF-8 bytes
+_OP_STRING = 0
+_STRING_HEADER = struct.Struct("<BII")
+# Opcode 1 defines an interned turtle id: index (uint32), id (uint64)
+_OP_ID = 1
+_ID_DEF = struct.Struct("<BIQ")
+# Opcode 14 is a whole command as JSON: length (uint32), UTF-8 JSON text
+_OP_JSON = 14
+_JSON_HEADER = struct.Struct("<BI")
+_COUNT = struct.Struct("<I")
+_POINT = struct.Struct("<ff")
+
+# type -> (opcode, [(field, struct code)]);
+# code "S" is an interned string index, "T" an interned turtle id index and "U" an
+# inline string: after the fixed part, a uint32 length and that many UTF-8 bytes
+_SPECS = {
+    "turtle_create": (2, [("id", "T")]),
+    "turtle_update": (3, [("id", "T"), ("x", "f"), ("y", "f"), ("heading", "f"),
+                          ("visible", "?"), ("pen_color", "S"), ("delay", "f")]),
+    "line": (4, [("x1", "f"), ("y1", "f"), ("x2", "f"), ("y2", "f"),
+                 ("color", "S"), ("width", "f")]),
+    "dot": (5, [("x", "f"), ("y", "f"), ("size", "f"), ("color", "S"), ("delay", "f")]),
+    "stamp": (6, [("x", "f"), ("y", "f"), ("heading", "f"), ("color", "S"),
+                  ("delay", "f")]),
+    "text": (7, [("x", "f"), ("y", "f"), ("text", "U"), ("align", "S"),
+                 ("font", "S"), ("size", "f"), ("color", "S")]),
+    "bgcolor": (8, [("color", "S")]),
+    "clear": (9, []),
+    "reset": (10, []),
+    "done": (11, []),
+    # Fixed part only; followed by a uint32 point count and that many float32 pairs
+    "fill": (12, [("color", "S")]),
+    "arc": (13, [("id", "T"), ("cx", "f"), ("cy", "f"), ("radius", "f"), ("start", "f"),
+                 ("span", "f"), ("color", "S"), ("width", "f"), ("duration", "f")]),
+}
+
+
+class _Record:
+    """Packing information for one command type."""
+
+    def __init__(self, cmd_type, opcode, fields):
+        self.type = cmd_type
+        self.opcode = opcode
+        # Fields in the fixed part, then the inline strings that follow it
+        self.names = [name for name, code in fields if code != "U"]
+        self.inline = [name for name, code in fields if code == "U"]
+        self.strings = [self.names.index(name) for name, code in fields if code == "S"]
+        self.ids = [self.names.index(name) for name, code in fields if code == "T"]
+        self.floats = [self.names.index(name) for name, code in fields if code == "f"]
+        codes = "".join("I" if code in "ST" else code for _, code in fields if code != "U")
+        self.struct = struct.Struct("<B" + codes)
+
+
+_RECORDS_BY_TYPE = {t: _Record(t, op, fields) for t, (op, fields) in _SPECS.items()}
+_RECORDS_BY_OPCODE = {r.opcode: r for r in _RECORDS_BY_TYPE.values()}
+
+
+class Encoder:
+    """Encode command dicts into binary records, interning strings as it goes."""
+
+    def __init__(self):
+        self._strings = {}  # string -> index
+        self._ids = {}  # turtle id -> index
+
+    def _intern_id(self, value, out):
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self._ids)
+            self._ids[value] = index
+            out.append(_ID_DEF.pack(_OP_ID, index, value))
+        return index
+
+    def _intern(self, value, out):
+        value = value if isinstance(value, str) else str(value)
+        index = self._strings.get(value)
+        if index is None:
+            index = len(self._strings)
+            self._strings[value] = index
+            data = value.encode("utf-8")
+            out.append(_STRING_HEADER.pack(_OP_STRING, index, len(data)))
+            out.append(data)
+        return index
+
+    def encode(self, cmd):
+        """Return the binary records (bytes) for one command."""
+        record = _RECORDS_BY_TYPE[cmd["type"]]
+        out = []  # Definitions of newly interned values come first
+        values = [cmd[name] for name in record.names]
+        for i in record.strings:
+            values[i] = self._intern(values[i], out)
+        for i in record.ids:
+            values[i] = self._intern_id(values[i], out)
+        definitions = len(out)
+        try:
+            for i in record.floats:
+                values[i] = float(values[i])
+            out.append(record.struct.pack(record.opcode, *values))
+            for name in record.inline:
+                value = cmd[name]
+                data = (value if isinstance(value, str) else str(value)).encode("utf-8")
+                out.append(_COUNT.pack(len(data)))
+                out.append(data)
+            if record.type == "fill":
+                points = cmd["points"]
+                out.append(_COUNT.pack(len(points)))
+                out.extend(_POINT.pack(float(x), float(y)) for x, y in points)
+        except (struct.error, OverflowError, TypeError, ValueError):
+            # Out of float32 range, not a number, a lone surrogate...
+            del out[definitions:]
+            cmd = dict(cmd)
+            for i in record.floats:
+                try:
+                    cmd[record.names[i]] = float(cmd[record.names[i]])
+                except (TypeError, ValueError):
+                    pass
+            data = json.dumps(cmd, default=str).encode("utf-8")
+            out.append(_JSON_HEADER.pack(_OP_JSON, len(data)))
+            out.append(data)
+        return b"".join(out)
+
+
+class Decoder:
+    """Decode a stream of binary records back into command dicts.
+
+    ``feed`` may be given arbitrary slices of the stream; incomplete trailing
+    records are kept until the rest arrives.
+    """
+
+    def __init__(self):
+        self._strings = []
+        self._ids = []
+        self._buffer = b""
+
+    def feed(self, data):
+        """Consume bytes and return the list of complete commands."""
+        buf = self._buffer + data if self._buffer else bytes(data)
+        cmds = []
+        pos = 0
+        end = len(buf)
+        while pos < end:
+            opcode = buf[pos]
+            if opcode == _OP_STRING:
+                if end - pos < _STRING_HEADER.size:
+                    break
+                _, index, length = _STRING_HEADER.unpack_from(buf, pos)
+                start = pos + _STRING_HEADER.size
+                if end - start < length:
+                    break
+                value = buf[start:start + length].decode("utf-8")
+                if index == len(self._strings):
+                    self._strings.append(value)
+                else:
+                    self._strings[index] = value
+                pos = start + length
+                continue
+            if opcode == _OP_ID:
+                if end - pos < _ID_DEF.size:
+                    break
+                _, index, value = _ID_DEF.unpack_from(buf, pos)
+                if index == len(self._ids):
+                    self._ids.append(value)
+                else:
+                    self._ids[index] = value
+                pos += _ID_DEF.size
+                continue
+            if opcode == _OP_JSON:
+                if end - pos < _JSON_HEADER.size:
+                    break
+                _, length = _JSON_HEADER.unpack_from(buf, pos)
+                start = pos + _JSON_HEADER.size
+                if end - start < length:
+                    break
+                cmds.append(json.loads(buf[start:start + length].decode("utf-8")))
+                pos = start + length
+                continue
+
+            record = _RECORDS_BY_OPCODE.get(opcode)
+            if record is None:
+                raise ValueError(f"unknown turtle opcode {opcode}")
+            size = record.struct.size
+            if end - pos < size:
+                break
+            values = list(record.struct.unpack_from(buf, pos))[1:]
+            next_pos = pos + size
+            for i in record.strings:
+                values[i] = self._strings[values[i]]
+            for i in record.ids:
+                values[i] = self._ids[values[i]]
+            cmd = dict(zip(record.names, values))
+            cmd["type"] = record.type
+            complete = True
+            for name in record.inline:
+                if end - next_pos < _COUNT.size:
+                    complete = False
+                    break
+                (length,) = _COUNT.unpack_from(buf, next_pos)
+                next_pos += _COUNT.size
+                if end - next_pos < length:
+                    complete = False
+                    break
+                cmd[name] = buf[next_pos:next_pos + length].decode("utf-8")
+                next_pos += length
+            if not complete:
+                break
+            if record.type == "fill":
+                if end - next_pos < _COUNT.size:
+                    break
+                (count,) = _COUNT.unpack_from(buf, next_pos)
+                next_pos += _COUNT.size
+                if end - next_pos < count * _POINT.size:
+                    break
+                cmd["points"] = [
+                    _POINT.unpack_from(buf, next_pos + i * _POINT.size) for i in range(count)
+                ]
+                next_pos += count * _POINT.size
+            cmds.append(cmd)
+            pos = next_pos
+        self._buffer = buf[pos:]
+        return cmds